@@ -0,0 +1,249 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+
+from libs.examples.synthetic_problem import generate_problem
+from libs.model.solver_params import SolverParams
+from libs.model.task_scheduling_intervals import ModelEngine, TaskSchedulingMultiOptWeightsIntervals
+from libs.model.task_scheduling_multiopt_weights import TaskSchedulingMultiOptWeights
+from libs.model.telemetry import telemetry
+from main import Problem, read_problem, solve_problem
+
+INPUT_FILES = [
+    './inputs/new/исходные данные.xml',
+    './inputs/v2/тестовое задание.xml',
+    './inputs/final/проверочное задание.xml'
+]
+SYNTHETIC = ['tasks=50,workers=8', 'tasks=150,workers=15', 'tasks=400,workers=30,density=0.05']
+SYNTHETIC_DEFAULTS = {'tasks': 100, 'workers': 10, 'density': 0.1, 'skills': 3, 'multi': 0.2, 'seed': 0}
+
+# mode name -> objectives in priority order, weighted is the weighted sum of all three
+MODES = {
+    'duration': ['duration'],
+    'cost': ['cost'],
+    'resources': ['resources'],
+    'lexicographic': ['duration', 'cost', 'resources'],
+    'weighted': ['duration', 'cost', 'resources']
+}
+WEIGHTS = {'duration': 0.4, 'cost': 0.4, 'resources': 0.2}
+
+# a metric regresses when it is worse than the baseline by the tolerance and by the slack
+TIME_METRICS = ['build_time', 'time_to_first', 'time_to_best']
+TIME_SLACK = 1.0        # seconds
+RSS_SLACK = 20          # MB
+
+
+def parse_synthetic(spec):
+    # 'tasks=200,workers=20,density=0.1,skills=3,multi=0.2,seed=0' -> generator params, missing ones by default
+    params = dict(SYNTHETIC_DEFAULTS)
+    for item in spec.split(','):
+        (key, value) = item.split('=')
+        if key not in params:
+            raise ValueError(f"Unknown synthetic parameter '{key}', expected one of: {', '.join(params)}")
+        params[key] = type(params[key])(value)
+
+    return params
+
+
+def get_instances(args):
+    instances = [{'name': os.path.relpath(f, './inputs'), 'input_file': f} for f in args.input_files]
+    for spec in args.synthetic:
+        params = parse_synthetic(spec)
+        name = 'synthetic/t{tasks}_w{workers}_d{density}_s{skills}_m{multi}_r{seed}'.format(**params)
+        instances.append({'name': name, 'synthetic': params})
+
+    return instances
+
+
+def load_instance(instance):
+    if 'input_file' in instance:
+        return read_problem(instance['input_file'])
+
+    params = instance['synthetic']
+    (tasks, resources) = generate_problem(params['tasks'], params['workers'], params['density'],
+                                          params['skills'], params['multi'], params['seed'])
+    return Problem(None, tasks, resources, [], None)
+
+
+def solve_weighted(problem, engine, s_params):
+    model_cls = TaskSchedulingMultiOptWeightsIntervals if engine == ModelEngine.INTERVALS \
+        else TaskSchedulingMultiOptWeights
+    model = model_cls(problem.resources, problem.algo_tasks, WEIGHTS,
+                      fixed_assignments=problem.fixed_assignments,
+                      resource_constraints=problem.resource_constraints,
+                      task_constraints=problem.task_constraints, solver_params=s_params)
+    return model.solve()
+
+
+def get_peak_rss():
+    # MB, weighted anchors are solved in child processes
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak_kb / 1024
+
+
+def to_metrics(report):
+    # build time, time to the first & the best incumbent since the run start, anchors of a weighted run included,
+    # gap of the last solve
+    phases = report['phase_totals']
+    incumbents = [incumbent for solve in report['solves'] for incumbent in solve['incumbents']]
+    last = report['solves'][-1]['response'] if report['solves'] else None
+
+    gap = None
+    if last is not None and last['status'] in ('OPTIMAL', 'FEASIBLE'):
+        gap = abs(last['objective_value'] - last['best_objective_bound']) / max(abs(last['objective_value']), 1)
+
+    return {
+        'build_time': sum(phases.get(p, 0) for p in ['build_model', 'preprocess_model', 'get_objective']),
+        'time_to_first': min((i['time'] for i in incumbents), default=None),
+        'time_to_best': max((i['time'] for i in incumbents), default=None),
+        'gap': gap
+    }
+
+
+def run_benchmark(instance, mode, engine, max_time):
+    # runs in a fresh process, so peak RSS is of this run only; solver output is dropped
+    result = {'instance': instance['name'], 'mode': mode, 'engine': engine, 'status': 'error',
+              'objective_value': None, 'duration': None, 'cost': None, 'resources': None,
+              'build_time': None, 'time_to_first': None, 'time_to_best': None, 'gap': None,
+              'wall_time': None, 'peak_rss_mb': None, 'error': None}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # processes of weighted anchors write to the inherited descriptor
+        sys.__stdout__.flush()
+        os.dup2(devnull.fileno(), sys.__stdout__.fileno())
+        try:
+            problem = load_instance(instance)
+
+            s_params = SolverParams.default()
+            s_params.max_iteration_search_time = max_time
+
+            telemetry.enable()
+            if mode == 'weighted':
+                solution = solve_weighted(problem, engine, s_params)
+            else:
+                solution = solve_problem(problem, MODES[mode], engine, s_params)
+            report = telemetry.get_report()
+
+            result.update(to_metrics(report))
+            result['wall_time'] = report['wall_time']
+            result['status'] = 'no_solution' if solution is None else 'ok'
+            if solution is not None:
+                for k in ['objective_value', 'duration', 'cost', 'resources']:
+                    result[k] = solution[k]
+        except Exception as e:
+            result['error'] = repr(e)
+
+    result['peak_rss_mb'] = get_peak_rss()
+    return result
+
+
+def get_regressions(result, baseline, tolerance):
+    # [(metric, baseline value, value)] where the run is worse than its baseline
+    regressions = []
+    if baseline['status'] == 'ok' and result['status'] != 'ok':
+        regressions.append(('status', baseline['status'], result['status']))
+        return regressions
+
+    # plans are compared by the objectives in priority order
+    objectives = MODES[result['mode']] if result['mode'] != 'weighted' else ['objective_value']
+    before = tuple(baseline[k] for k in objectives)
+    after = tuple(result[k] for k in objectives)
+    if None not in before and None not in after and after > before:
+        regressions.append(('objective', before, after))
+
+    for k in TIME_METRICS:
+        if baseline[k] is not None and result[k] is not None and result[k] > baseline[k] * (1 + tolerance) + TIME_SLACK:
+            regressions.append((k, baseline[k], result[k]))
+
+    if result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance) + RSS_SLACK:
+        regressions.append(('peak_rss_mb', baseline['peak_rss_mb'], result['peak_rss_mb']))
+
+    return regressions
+
+
+def compare(results, baseline_file, tolerance):
+    # number of regressed runs, runs missing in the baseline are new and can't regress
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(b['instance'], b['mode'], b['engine']): b for b in json.load(f)}
+
+    num_regressed = 0
+    for result in results:
+        key = (result['instance'], result['mode'], result['engine'])
+        if key not in baseline:
+            continue
+
+        regressions = get_regressions(result, baseline[key], tolerance)
+        if regressions:
+            num_regressed += 1
+        for (metric, before, after) in regressions:
+            print(f'REGRESSION {result["instance"]} {result["mode"]}: {metric} {before} -> {after}')
+
+    return num_regressed
+
+
+def format_value(value, fmt):
+    return '-' if value is None else fmt.format(value)
+
+
+def print_results(results):
+    print('{:<44} {:<14} {:<12} {:>12} {:>8} {:>8} {:>8} {:>7} {:>8}'.format(
+        'Instance', 'Mode', 'Status', 'Objective', 'Build,s', 'First,s', 'Best,s', 'Gap', 'RSS,MB'))
+    for r in results:
+        print('{:<44} {:<14} {:<12} {:>12} {:>8} {:>8} {:>8} {:>7} {:>8.0f}'.format(
+            r['instance'], r['mode'], r['status'], format_value(r['objective_value'], '{:.0f}'),
+            format_value(r['build_time'], '{:.2f}'), format_value(r['time_to_first'], '{:.2f}'),
+            format_value(r['time_to_best'], '{:.2f}'), format_value(r['gap'], '{:.1%}'), r['peak_rss_mb']))
+
+
+# python benchmark.py -o ./results/benchmark.json -t 30
+# python benchmark.py -o ./results/benchmark.json -t 30 --baseline ./results/benchmark_baseline.json
+# python benchmark.py -o ./results/scaling.json -m duration --input-files --synthetic tasks=1000,workers=50 tasks=1000,workers=50,density=0.3
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Task scheduler benchmark')
+    parser.add_argument('-o', '--output-file', type=str, required=True,
+                        help='results json, a baseline for later runs')
+    parser.add_argument('-t', '--max-time', type=int, default=30,
+                        help='max search time of a solve in seconds')
+    parser.add_argument('-m', '--modes', nargs='+', default=list(MODES), choices=list(MODES),
+                        help='optimization modes to run')
+    parser.add_argument('-e', '--engine', type=str, default=ModelEngine.INTERVALS.value,
+                        help='days, intervals')
+    parser.add_argument('--input-files', nargs='*', default=INPUT_FILES,
+                        help='input xml files, the bundled inputs by default')
+    parser.add_argument('--synthetic', nargs='*', default=SYNTHETIC,
+                        help='generated instances: tasks=N,workers=N,density=P,skills=N,multi=P,seed=N')
+    parser.add_argument('--baseline', type=str,
+                        help='results json of a previous run: regressions are reported & exit code is 1')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown & memory growth tolerated against the baseline')
+
+    args = parser.parse_args()
+
+    instances = get_instances(args)
+    print(f'{len(instances)} instances x {len(args.modes)} modes, {args.max_time} s per solve')
+
+    # one run at a time in a fresh process: timings don't compete for cores, peak RSS is per run
+    results = []
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for instance in instances:
+            for mode in args.modes:
+                start = time.time()
+                result = executor.submit(run_benchmark, instance, mode, args.engine, args.max_time).result()
+                results.append(result)
+                print('{:<12} {:>8.2f} s  {} {}'.format(result['status'], time.time() - start, instance['name'], mode))
+
+    print_results(results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output_file)), exist_ok=True)
+    with open(args.output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+
+    if args.baseline:
+        num_regressed = compare(results, args.baseline, args.tolerance)
+        print(f'{num_regressed} of {len(results)} runs regressed against {args.baseline}')
+        sys.exit(1 if num_regressed else 0)
@@ -1,3 +1,7 @@
+from datetime import datetime
+
+from libs.examples.project_calendar import CalendarIndex, get_unavailability
+from libs.examples.project_xml import ProjectCalendar, CalendarException
 from libs.examples.solution_printer import SolutionPrinter
 from libs.model.task_scheduling import MinResourcesModel
 
@@ -24,10 +28,21 @@ resources = [
     ('QA2', 40.0, ['qa']),
 ]
 
-holidays = [
-    (3, 3, 7)  # SA is on holiday from 3 to 7
+# (uid, name, base_calendar_uid, week_days, working_hours, exceptions)
+calendars = [
+    ProjectCalendar('1', 'Standard', None, {1: False, 2: True, 3: True, 4: True, 5: True, 6: True, 7: False}, {}, []),
+    ProjectCalendar('2', 'SA', '1', {}, {}, [
+        CalendarException(datetime(2024, 2, 8), datetime(2024, 2, 14, 23, 59, 59), False)  # SA is on holiday
+    ]),
 ]
 
+start_date = datetime(2024, 2, 5, 9)
+project_calendar = CalendarIndex(calendars, '1', start_date)
+sa_calendar = CalendarIndex(calendars, '2', start_date)
+
+# holiday in working days of the project: from 3 to 7
+holidays = [(3, start, end) for (start, end) in get_unavailability(project_calendar, sa_calendar, 20)]
+
 model = MinResourcesModel(resources, tasks, resource_constraints=holidays)
 
 solution = model.solve()
@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta, time
+
+# a year without a working day means the calendar is broken, not a long holiday
+MAX_DAYS_OFF = 366
+
+
+def to_weekday(day_type):
+    # MS Project DayType 1 - Sunday .. 7 - Saturday -> datetime.weekday() 0 - Monday .. 6 - Sunday
+    return (day_type + 5) % 7
+
+
+class CalendarIndex:
+    """Working days of an MS Project calendar: solver day index <-> date lookups in O(1)."""
+
+    def __init__(self,
+                 calendars: list,                   # [ProjectCalendar]
+                 calendar_uid: str,
+                 start_date: datetime
+                 ):
+        self.calendars = {c.uid: c for c in calendars}
+
+        # week_days[weekday] -> working, exceptions[date] -> working, base calendars first
+        self.week_days = {}
+        self.working_hours = {}
+        self.exceptions = {}
+        for calendar in self.get_chain(calendar_uid):
+            for day_type, working in calendar.week_days.items():
+                self.week_days[to_weekday(day_type)] = working
+            for day_type, hours in calendar.working_hours.items():
+                self.working_hours[to_weekday(day_type)] = hours
+            for exception in calendar.exceptions:
+                day = exception.from_date.date()
+                while day <= exception.to_date.date():
+                    self.exceptions[day] = exception.working
+                    day += timedelta(days=1)
+
+        self.start_date = start_date
+        self.start_time = start_date.time()
+        self.finish_time = self.get_finish_time()
+
+        # dates[d] -> date of the working day d, days[date] -> d; extended on demand
+        self.dates = []
+        self.days = {}
+        self.__next_date = start_date.date()
+
+    def get_chain(self, calendar_uid):
+        # calendar with its base calendars, the most basic first
+        chain = []
+        while calendar_uid in self.calendars and all(c.uid != calendar_uid for c in chain):
+            calendar = self.calendars[calendar_uid]
+            chain.append(calendar)
+            calendar_uid = calendar.base_calendar_uid
+
+        return list(reversed(chain))
+
+    def get_finish_time(self):
+        # end of the last working time, 8 hours after the start if the calendar has no working times
+        for weekday in sorted(self.working_hours):
+            (_, to_time) = self.working_hours[weekday]
+            if to_time:
+                return time.fromisoformat(to_time)
+
+        return (datetime.combine(self.start_date.date(), self.start_time) + timedelta(hours=8)).time()
+
+    def is_working(self, date):
+        return self.exceptions.get(date, self.week_days.get(date.weekday(), True))
+
+    def extend(self, num_days):
+        # index working days up to num_days, one pass over the calendar
+        days_off = 0
+        while len(self.dates) < num_days:
+            date = self.__next_date
+            self.__next_date += timedelta(days=1)
+
+            if not self.is_working(date):
+                days_off += 1
+                if days_off > MAX_DAYS_OFF:
+                    raise ValueError(f'No working days in the calendar after {date}')
+                continue
+
+            days_off = 0
+            self.days[date] = len(self.dates)
+            self.dates.append(date)
+
+    def to_date(self, day):
+        # date of the working day, day 0 is the first working day of the project
+        self.extend(day + 1)
+        return self.dates[day]
+
+    def to_day(self, date):
+        # working day index of the date, the next working day for a day off
+        while self.__next_date <= date:
+            self.extend(len(self.dates) + 1)
+
+        if date in self.days:
+            return self.days[date]
+
+        return bisect_left(self.dates, date)
+
+    def to_start(self, day):
+        return datetime.combine(self.to_date(day), self.start_time)
+
+    def to_finish(self, start, end):
+        # end is exclusive: a task finishes at the end of its last working day
+        if end <= start:
+            return self.to_start(start)
+
+        return datetime.combine(self.to_date(end - 1), self.finish_time)
+
+
+def get_unavailability(project_calendar: CalendarIndex, resource_calendar: CalendarIndex, num_days):
+    # [(start, end)] -> inclusive ranges of project working days the resource doesn't work on
+    project_calendar.extend(num_days)
+
+    ranges = []
+    for d in range(num_days):
+        if resource_calendar.is_working(project_calendar.dates[d]):
+            continue
+
+        if ranges and ranges[-1][1] == d - 1:
+            ranges[-1] = (ranges[-1][0], d)
+        else:
+            ranges.append((d, d))
+
+    return ranges
+
+
+def get_resource_constraints(project, resources, num_days):
+    # resource calendars -> (resource_id, start, end) unavailability, resources are (uid, cost_hr, skills)
+    project_calendar = CalendarIndex(project.calendars, project.calendar_uid, project.start_date)
+    calendar_uids = {r.uid: r.calendar_uid for r in project.resources}
+
+    resource_constraints = []
+    for w, (uid, *_) in enumerate(resources):
+        calendar_uid = calendar_uids.get(uid)
+        if calendar_uid is None or calendar_uid == project.calendar_uid:
+            continue
+
+        resource_calendar = CalendarIndex(project.calendars, calendar_uid, project.start_date)
+        for (start, end) in get_unavailability(project_calendar, resource_calendar, num_days):
+            resource_constraints.append((w, start, end))
+
+    return resource_constraints
@@ -0,0 +1,296 @@
+import copy
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+NS = 'http://schemas.microsoft.com/project'
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def q(tag):
+    return f'{{{NS}}}{tag}'
+
+
+def text(elem, tag, default=None):
+    value = elem.findtext(q(tag))
+    return default if value is None else value
+
+
+def parse_date(value):
+    return datetime.strptime(value, DATE_FORMAT) if value else None
+
+
+def get_parent(outline_number):
+    return outline_number.rsplit('.', 1)[0] if '.' in outline_number else None
+
+
+def roll_up_dates(outlines, dates):
+    # summary (start, finish) by outline, spans of the sub tasks; dates[outline] -> (start, finish) of the leaves,
+    # a leaf without dates is left out of its parents' span; deepest outline levels first, so nested summaries roll up
+    children = {}
+    for outline in outlines:
+        parent = get_parent(outline)
+        if parent in outlines:
+            children.setdefault(parent, []).append(outline)
+
+    dates = {o: d for o, d in dates.items() if o not in children}
+    summaries = {}
+    for outline in sorted(children, key=lambda o: o.count('.'), reverse=True):
+        spans = [dates[c] for c in children[outline] if c in dates]
+        if not spans:
+            continue
+
+        dates[outline] = summaries[outline] = (min(s for (s, _) in spans), max(f for (_, f) in spans))
+
+    return summaries
+
+
+class PredecessorLink(NamedTuple):
+    predecessor_uid: str
+    type: int                   # 0 - FF, 1 - FS, 2 - SF, 3 - SS
+    lag: int                    # LinkLag, tenths of a minute
+
+
+class ProjectTask(NamedTuple):
+    uid: str
+    name: str
+    outline_number: str
+    summary: bool
+    work: Optional[str]         # e.g. PT40H0M0S
+    start: Optional[datetime]
+    finish: Optional[datetime]
+    predecessors: list          # [PredecessorLink]
+
+
+class ProjectResource(NamedTuple):
+    uid: str
+    name: str
+    calendar_uid: Optional[str]
+
+
+class ProjectAssignment(NamedTuple):
+    uid: str
+    task_uid: str
+    resource_uid: str
+    start: Optional[datetime]
+    finish: Optional[datetime]
+
+
+class CalendarException(NamedTuple):
+    from_date: datetime
+    to_date: datetime
+    working: bool
+
+
+class ProjectCalendar(NamedTuple):
+    uid: str
+    name: str
+    base_calendar_uid: Optional[str]
+    week_days: dict             # DayType (1 - Sunday .. 7 - Saturday) -> working
+    working_hours: dict         # DayType -> (FromTime of the first, ToTime of the last working time), e.g. ('09:00:00', '18:00:00')
+    exceptions: list            # [CalendarException]
+
+
+class Project(NamedTuple):
+    start_date: datetime
+    calendar_uid: Optional[str]
+    tasks: list                 # [ProjectTask]
+    resources: list             # [ProjectResource]
+    assignments: list           # [ProjectAssignment]
+    calendars: list             # [ProjectCalendar]
+    status_date: Optional[datetime] = None      # date the progress of a plan is reported at
+
+
+def to_task(elem):
+    predecessors = [PredecessorLink(text(link, 'PredecessorUID'),
+                                    int(text(link, 'Type', '1')),
+                                    int(text(link, 'LinkLag', '0')))
+                    for link in elem.iterfind(q('PredecessorLink'))]
+
+    return ProjectTask(uid=text(elem, 'UID'),
+                       name=text(elem, 'Name', ''),
+                       outline_number=text(elem, 'OutlineNumber', ''),
+                       summary=text(elem, 'Summary') == '1',
+                       work=text(elem, 'Work'),
+                       start=parse_date(text(elem, 'Start')),
+                       finish=parse_date(text(elem, 'Finish')),
+                       predecessors=predecessors)
+
+
+def to_resource(elem):
+    return ProjectResource(uid=text(elem, 'UID'),
+                           name=text(elem, 'Name', ''),
+                           calendar_uid=text(elem, 'CalendarUID'))
+
+
+def to_assignment(elem):
+    return ProjectAssignment(uid=text(elem, 'UID'),
+                             task_uid=text(elem, 'TaskUID'),
+                             resource_uid=text(elem, 'ResourceUID'),
+                             start=parse_date(text(elem, 'Start')),
+                             finish=parse_date(text(elem, 'Finish')))
+
+
+def to_calendar(elem):
+    week_days = {}
+    working_hours = {}
+    exceptions = []
+
+    for week_day in elem.iterfind(f"{q('WeekDays')}/{q('WeekDay')}"):
+        day_type = int(text(week_day, 'DayType'))
+        working = text(week_day, 'DayWorking') == '1'
+        period = week_day.find(q('TimePeriod'))
+
+        # DayType 0 is an exception, older files keep them among week days
+        if day_type == 0 and period is not None:
+            exceptions.append(CalendarException(parse_date(text(period, 'FromDate')),
+                                                parse_date(text(period, 'ToDate')),
+                                                working))
+        elif day_type != 0:
+            week_days[day_type] = working
+            times = week_day.findall(f"{q('WorkingTimes')}/{q('WorkingTime')}")
+            if times:
+                working_hours[day_type] = (text(times[0], 'FromTime'), text(times[-1], 'ToTime'))
+
+    for exception in elem.iterfind(f"{q('Exceptions')}/{q('Exception')}"):
+        period = exception.find(q('TimePeriod'))
+        if period is None:
+            continue
+        exceptions.append(CalendarException(parse_date(text(period, 'FromDate')),
+                                            parse_date(text(period, 'ToDate')),
+                                            text(exception, 'DayWorking') == '1'))
+
+    return ProjectCalendar(uid=text(elem, 'UID'),
+                           name=text(elem, 'Name', ''),
+                           base_calendar_uid=text(elem, 'BaseCalendarUID'),
+                           week_days=week_days,
+                           working_hours=working_hours,
+                           exceptions=sorted(set(exceptions)))
+
+
+class ProjectXmlReader:
+    """Streaming MS Project XML reader, keeps only what the scheduler needs."""
+
+    # (parent, element) -> records list and a converter
+    RECORDS = {
+        ('Tasks', 'Task'): ('tasks', to_task),
+        ('Resources', 'Resource'): ('resources', to_resource),
+        ('Assignments', 'Assignment'): ('assignments', to_assignment),
+        ('Calendars', 'Calendar'): ('calendars', to_calendar),
+    }
+
+    def read(self, input_file):
+        records = {'tasks': [], 'resources': [], 'assignments': [], 'calendars': []}
+        start_date = None
+        calendar_uid = None
+        status_date = None
+        path = []
+
+        for event, elem in ET.iterparse(input_file, events=('start', 'end')):
+            if event == 'start':
+                path.append(local_name(elem.tag))
+                continue
+
+            if len(path) == 2:
+                match path[1]:
+                    case 'StartDate': start_date = parse_date(elem.text)
+                    case 'CalendarUID': calendar_uid = elem.text
+                    case 'StatusDate': status_date = parse_date(elem.text)
+
+            if len(path) == 3 and (path[1], path[2]) in self.RECORDS:
+                (key, converter) = self.RECORDS[path[1], path[2]]
+                records[key].append(converter(elem))
+                elem.clear()
+
+            path.pop()
+
+        return Project(start_date=start_date, calendar_uid=calendar_uid, status_date=status_date, **records)
+
+
+class ProjectXmlWriter:
+    """Patches Start/Finish/ResourceUID of the original MS Project XML with a solution."""
+
+    def __init__(self, input_file, calendar=None):
+        ET.register_namespace('', NS)
+        # CalendarIndex, solver days are working days; calendar days if None
+        self.calendar = calendar
+        self.tree = ET.parse(input_file)
+        self.project = self.tree.getroot()
+
+        self.start_date = parse_date(text(self.project, 'StartDate'))
+        self.tasks = {text(t, 'UID'): t for t in self.project.iterfind(f"{q('Tasks')}/{q('Task')}")}
+        self.assignments_root = self.project.find(q('Assignments'))
+        self.assignments = {}
+        for a in self.assignments_root.iterfind(q('Assignment')):
+            self.assignments.setdefault(text(a, 'TaskUID'), a)
+
+    def to_start(self, start):
+        if self.calendar is None:
+            return self.start_date + timedelta(days=start)
+
+        return self.calendar.to_start(start)
+
+    def to_finish(self, start, finish):
+        if self.calendar is None:
+            return self.start_date + timedelta(days=finish)
+
+        return self.calendar.to_finish(start, finish)
+
+    def set_text(self, elem, tag, value):
+        child = elem.find(q(tag))
+        if child is None:
+            child = ET.SubElement(elem, q(tag))
+        child.text = value
+
+    def new_assignment(self, task_uid, task_effort):
+        # first assignment as a template
+        assignment = copy.deepcopy(self.assignments_root.find(q('Assignment')))
+        self.assignments_root.append(assignment)
+
+        self.set_text(assignment, 'UID', str(len(self.assignments_root)))
+        self.set_text(assignment, 'TaskUID', task_uid)
+        self.set_text(assignment, 'GUID', str(uuid.uuid4()))
+        self.set_text(assignment, 'RemainingWork', task_effort)
+        self.set_text(assignment, 'Work', task_effort)
+        self.assignments[task_uid] = assignment
+
+        return assignment
+
+    def reassign(self, tasks, resources, solution_task_assignments):
+        for t in range(len(tasks)):
+            (start, finish, w) = solution_task_assignments[t]
+            (task_name, _, task_effort, __) = tasks[t]
+            (worker_name, *_) = resources[w]
+
+            new_start = self.to_start(start).strftime(DATE_FORMAT)
+            new_finish = self.to_finish(start, finish).strftime(DATE_FORMAT)
+
+            assignment = self.assignments.get(task_name)
+            if assignment is None:
+                assignment = self.new_assignment(task_name, task_effort)
+
+            self.set_text(assignment, 'ResourceUID', worker_name)
+            self.set_text(assignment, 'Start', new_start)
+            self.set_text(assignment, 'Finish', new_finish)
+
+            task = self.tasks[task_name]
+            self.set_text(task, 'Start', new_start)
+            self.set_text(task, 'Finish', new_finish)
+
+    def update_parents_dates(self):
+        # summary task spans its sub tasks, dates in DATE_FORMAT compare as strings
+        by_outline = {text(t, 'OutlineNumber'): t for t in self.tasks.values()}
+        dates = {o: (text(t, 'Start'), text(t, 'Finish')) for o, t in by_outline.items()
+                 if text(t, 'Start') and text(t, 'Finish')}
+
+        for outline, (start, finish) in roll_up_dates(set(by_outline), dates).items():
+            self.set_text(by_outline[outline], 'Start', start)
+            self.set_text(by_outline[outline], 'Finish', finish)
+
+    def write(self, output_file):
+        self.tree.write(output_file, encoding='UTF-8', xml_declaration=True)
@@ -10,11 +10,16 @@ from libs.model.solver_params import SolverParams
 from libs.model.task_scheduling import MinCostModel
 from libs.model.task_scheduling_multiopt import TaskSchedulingMultiOpt
 from libs.model.task_scheduling_multiopt_weights import TaskSchedulingMultiOptWeights
-from main import INPUT_JSON, find_uid_index, get_effort, clear_task_name, get_price, get_role, OUTPUT_JSON, get_obj_dict
+from libs.examples.project_calendar import CalendarIndex
+from libs.examples.project_xml import PredecessorLink, ProjectXmlReader
+from main import to_algo_tasks, get_price, get_role
 
 
 
 
+def get_obj_dict(obj):
+    return obj.__dict__
+
 INPUT_JSON = 'in.json'
 OUTPUT_JSON = 'out.json'
 xml_file = 'C:\\Projects\\hack-it-purple-2024\\inputs\\final\\проверочное задание.xml'
@@ -45,14 +50,6 @@ with open(INPUT_JSON, 'w', encoding='utf-8') as f:
 
 data = json.load(open(INPUT_JSON, encoding='utf-8'), object_hook=lambda d: SimpleNamespace(**d))
 
-def get_task_skill(t_skill):
-    skills = ['Тестирование', 'Разработка', 'Аналитика']
-
-    if t_skill not in skills:
-        return ''
-    else:
-        return t_skill
-
 tasks = []
 for t in data.Project.Tasks.Task:
     if t.Summary == "1" or "Веха" in t.Name:
@@ -63,14 +60,12 @@ for t in data.Project.Tasks.Task:
         if not hasattr(t, 'Work'):
             tasks.append((t.UID, t.Name, "No0H", []))
         else:
-            tasks.append((t.UID, t.Name, t.Work, [t.PredecessorLink.PredecessorUID]))
+            links = t.PredecessorLink if isinstance(t.PredecessorLink, list) else [t.PredecessorLink]
+            tasks.append((t.UID, t.Name, t.Work, [PredecessorLink(l.PredecessorUID, int(l.Type), int(l.LinkLag))
+                                                  for l in links]))
 # pprint(tasks)
 
-algo_tasks = []
-for t in tasks:
-    (uid, name, effort_str, deps) = t
-    deps_idx = [find_uid_index(deps[0] , tasks)] if len(deps)> 0 else []
-    algo_tasks.append((uid, get_effort(effort_str), get_task_skill(clear_task_name(name)), deps_idx))
+algo_tasks = to_algo_tasks(tasks)
 pprint(algo_tasks)
 
 skill_mapping = {'Тестировщик': 'Тестирование',
@@ -83,9 +78,9 @@ skill_mapping = {'Тестировщик': 'Тестирование',
 
 resources = []
 for r in data.Project.Resources.Resource:
-    if get_role(r) not in skill_mapping:
+    if get_role(r.Name) not in skill_mapping:
         continue
-    resources.append((r.UID, get_price(r.Name), [skill_mapping[get_role(r)]]))
+    resources.append((r.UID, get_price(r.Name), [skill_mapping[get_role(r.Name)]]))
 
 pprint(resources)
 
@@ -99,8 +94,12 @@ print('\n=============================\n'
     'Resources assignments:')
 printer.print_workers_tasks(tasks, resources, solution['workers_assignments'])
 
+# solver days are working days of the project calendar
+project = ProjectXmlReader().read(xml_file)
+calendar = CalendarIndex(project.calendars, project.calendar_uid, project.start_date)
+
 builder = SolutionBuilder()
-builder.reassign(data, tasks, resources, solution['task_assignments'])
+builder.reassign(data, tasks, resources, solution['task_assignments'], calendar)
 builder.update_parents_dates(data)
 
 with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
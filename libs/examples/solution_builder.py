@@ -3,19 +3,28 @@ from pprint import pprint
 import copy
 import uuid
 
+from libs.examples.project_xml import roll_up_dates
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
 class SolutionBuilder:
-    def reassign(self, data, tasks, resources, solution_task_assignments):
-        date_format = "%Y-%m-%dT%H:%M:%S"
-        project_start_date = datetime.strptime(data.Project.StartDate, date_format)
+    def reassign(self, data, tasks, resources, solution_task_assignments, calendar=None):
+        project_start_date = datetime.strptime(data.Project.StartDate, DATE_FORMAT)
+
+        # indexes are built once, the first assignment of a task is the one to update
+        tasks_by_uid = {t.UID: t for t in data.Project.Tasks.Task}
+        assignments_by_task = {}
+        for a in data.Project.Assignments.Assignment:
+            assignments_by_task.setdefault(a.TaskUID, a)
 
         for t in range(len(tasks)):
             (start, finish, w) = solution_task_assignments[t]
             (task_name, _, task_effort, __) = tasks[t]
             (worker_name, *_) = resources[w]
 
-            try:
-                assignment = next(t for t in data.Project.Assignments.Assignment if t.TaskUID == task_name)
-            except:
+            assignment = assignments_by_task.get(task_name)
+            if assignment is None:
                 assignment = data.Project.Assignments.Assignment[0] #todo first as template
                 assignment = copy.copy(assignment)
                 data.Project.Assignments.Assignment.append(assignment)
@@ -24,57 +33,28 @@ class SolutionBuilder:
                 assignment.GUID = str(uuid.uuid4())
                 assignment.RemainingWork = task_effort
                 assignment.Work = task_effort
+                assignments_by_task[task_name] = assignment
 
             assignment.ResourceUID = worker_name
-            new_start = project_start_date + timedelta(days = start)
-            new_finish = project_start_date + timedelta(days = finish)
-            assignment.Start = new_start.strftime(date_format)
-            assignment.Finish = new_finish.strftime(date_format)
-
-            task = next(t for t in data.Project.Tasks.Task if t.UID == task_name)
-            new_start = project_start_date + timedelta(days = start)
-            new_finish = project_start_date + timedelta(days = finish)
-            task.Start = new_start.strftime(date_format)
-            task.Finish = new_finish.strftime(date_format)
-            
+            if calendar is None:
+                new_start = project_start_date + timedelta(days = start)
+                new_finish = project_start_date + timedelta(days = finish)
+            else:
+                new_start = calendar.to_start(start)
+                new_finish = calendar.to_finish(start, finish)
+            assignment.Start = new_start.strftime(DATE_FORMAT)
+            assignment.Finish = new_finish.strftime(DATE_FORMAT)
+
+            task = tasks_by_uid[task_name]
+            task.Start = new_start.strftime(DATE_FORMAT)
+            task.Finish = new_finish.strftime(DATE_FORMAT)
 
     def update_parents_dates(self, data):
-        node_list = []
-        for i in data.Project.Tasks.Task:
-            node_list.append(i.OutlineNumber)
-
-        leaves_list = []
-        for s in node_list:
-            if not any([f'{s}.' in r for r in node_list if s != r]):
-                leaves_list.append(s)
-
-        parents_list = [t for t in node_list if t not in leaves_list]
-
-        tasks_with_dates = []
-        date_format = "%Y-%m-%dT%H:%M:%S"
-
-        for i in leaves_list:
-            try:
-                task = next(t for t in data.Project.Tasks.Task if t.OutlineNumber == i)
-                tasks_with_dates.append((
-                    task.OutlineNumber, 
-                    datetime.strptime(task.Start, date_format),
-                    datetime.strptime(task.Finish, date_format))
-                )
-            except:
-                pass
-
-        for i in parents_list:
-            try:
-                task = next(t for t in data.Project.Tasks.Task if t.OutlineNumber == i)
-                q = task.OutlineNumber
-                all_sub_tasks = list(filter(lambda t: t[0].startswith(f'{q}.'), tasks_with_dates))
-
-                min_start = min(all_sub_tasks, key=lambda t: t[1])[1]
-                max_start = max(all_sub_tasks, key=lambda t: t[2])[2]
-
-                task.Start = min_start.strftime(date_format)
-                task.Finish = max_start.strftime(date_format)
-            except:
-                pass
-
+        by_outline = {t.OutlineNumber: t for t in data.Project.Tasks.Task}
+        dates = {outline: (datetime.strptime(task.Start, DATE_FORMAT), datetime.strptime(task.Finish, DATE_FORMAT))
+                 for outline, task in by_outline.items() if hasattr(task, 'Start') and hasattr(task, 'Finish')}
+
+        for outline, (start, finish) in roll_up_dates(set(by_outline), dates).items():
+            task = by_outline[outline]
+            task.Start = start.strftime(DATE_FORMAT)
+            task.Finish = finish.strftime(DATE_FORMAT)
@@ -0,0 +1,37 @@
+import random
+
+SKILLS = ['Аналитика', 'Разработка', 'Тестирование', 'Архитектура', 'Дизайн', 'Поддержка']
+# hours of a task, whole working days
+EFFORTS = [8, 16, 24, 40, 80]
+# links only to recent tasks, like workstreams of a real plan
+LINK_WINDOW = 20
+
+
+def generate_problem(num_tasks: int,
+                     num_workers: int,
+                     density: float = 0.1,          # chance of a link to each of the LINK_WINDOW previous tasks
+                     num_skills: int = 3,           # skills in the mix, the first ones are the most demanded
+                     multi_skilled: float = 0.2,    # share of workers with a second skill
+                     seed: int = 0):
+    # (tasks, resources) of a random project: (name, effort_hrs, skill_required, depends_on_tasks), (name, cost_hr, skills)
+    rnd = random.Random(seed)
+    skills = SKILLS[:max(1, min(num_skills, len(SKILLS)))]
+    # skill mix: demand of a skill halves with every next one
+    demand = [2 ** -i for i in range(len(skills))]
+
+    tasks = []
+    for t in range(num_tasks):
+        depends_on_tasks = [dep for dep in range(max(0, t - LINK_WINDOW), t) if rnd.random() < density]
+        tasks.append((f'task{t}', rnd.choice(EFFORTS), rnd.choices(skills, demand)[0], depends_on_tasks))
+
+    # every skill has a worker, the rest are split by demand
+    resources = []
+    for w in range(num_workers):
+        skill = skills[w] if w < len(skills) else rnd.choices(skills, demand)[0]
+        worker_skills = [skill]
+        if len(skills) > 1 and rnd.random() < multi_skilled:
+            worker_skills.append(rnd.choice([s for s in skills if s != skill]))
+
+        resources.append((f'worker{w}', rnd.randrange(1000, 3001, 100), worker_skills))
+
+    return (tasks, resources)
@@ -0,0 +1,157 @@
+from enum import Enum
+from typing import NamedTuple
+
+from libs.model.durations import max_duration
+
+
+class LinkType(int, Enum):
+    # same codes as PredecessorLink.Type of MS Project
+    FF = 0                          # finish to finish
+    FS = 1                          # finish to start
+    SF = 2                          # start to finish
+    SS = 3                          # start to start
+
+
+class Dependency(NamedTuple):
+    task: int                       # index of the predecessor task
+    type: LinkType = LinkType.FS
+    lag: int = 0                    # days, negative is a lead
+
+
+def to_dependency(dep):
+    # plain task index is a finish to start link without lag
+    if isinstance(dep, int):
+        return Dependency(dep)
+
+    return Dependency(*dep)
+
+
+def get_offset(dependency: Dependency, dep_duration, duration):
+    # every link type is a bound on the difference of the starts: start >= dep_start + offset
+    match dependency.type:
+        case LinkType.SS: return dependency.lag
+        case LinkType.FF: return dep_duration + dependency.lag - duration
+        case LinkType.SF: return dependency.lag - duration
+
+    return dep_duration + dependency.lag
+
+
+class DependencyGraph:
+    """Task dependencies as start offsets: topological order, cycles & transitive reduction."""
+
+    def __init__(self,
+                 tasks: list                        # (name, effort_hrs, skill_required, depends_on_tasks)
+                 ):
+        self.num_tasks = len(tasks)
+        self.durations = [max_duration([t]) for t in tasks]
+        self.dependencies = [[to_dependency(dep) for dep in depends_on_tasks] for (*_, depends_on_tasks) in tasks]
+
+        # predecessors[t] / successors[t] -> {task: offset}, the tightest of the parallel links
+        self.predecessors = [{} for _ in range(self.num_tasks)]
+        self.successors = [{} for _ in range(self.num_tasks)]
+        for t in range(self.num_tasks):
+            for dependency in self.dependencies[t]:
+                offset = get_offset(dependency, self.durations[dependency.task], self.durations[t])
+                offset = max(offset, self.predecessors[t].get(dependency.task, offset))
+
+                self.predecessors[t][dependency.task] = offset
+                self.successors[dependency.task][t] = offset
+
+        self.order = self.topological_order()
+        self.__reduced = None
+
+    def ordered_prefix(self):
+        # Kahn's algorithm, tasks which don't depend on a cycle in topological order
+        in_degree = [len(p) for p in self.predecessors]
+
+        order = [t for t in range(self.num_tasks) if in_degree[t] == 0]
+        for t in order:
+            for s in self.successors[t]:
+                in_degree[s] -= 1
+                if in_degree[s] == 0:
+                    order.append(s)
+
+        return order
+
+    def topological_order(self):
+        # None if dependencies have a cycle
+        order = self.ordered_prefix()
+        if len(order) != self.num_tasks:
+            return None
+
+        return order
+
+    def find_cycle(self):
+        # tasks of a dependency cycle in link order, None if there is no cycle
+        if self.order is not None:
+            return None
+
+        # every task left out of the prefix has a predecessor left out too, so walking them gets back to the path
+        ordered = set(self.ordered_prefix())
+        path = []
+        on_path = {}
+        t = next(t for t in range(self.num_tasks) if t not in ordered)
+        while t not in on_path:
+            on_path[t] = len(path)
+            path.append(t)
+            t = next(p for p in self.predecessors[t] if p not in ordered)
+
+        return list(reversed(path[on_path[t]:]))
+
+    def components(self):
+        # weakly connected components: task lists whose dependencies never cross, in plan order
+        component = list(range(self.num_tasks))
+
+        def find(t):
+            while component[t] != t:
+                component[t] = component[component[t]]
+                t = component[t]
+            return t
+
+        for t in range(self.num_tasks):
+            for dep in self.predecessors[t]:
+                component[find(dep)] = find(t)
+
+        components = {}
+        for t in range(self.num_tasks):
+            components.setdefault(find(t), []).append(t)
+
+        return list(components.values())
+
+    def precedences(self):
+        # [(dep, t, offset)] -> start of t >= start of dep + offset
+        return [(dep, t, offset) for t in range(self.num_tasks) for dep, offset in self.predecessors[t].items()]
+
+    def longest_paths(self):
+        # longest[t] -> {s: the greatest offset of start s over start t along any dependency path}
+        longest = [None] * self.num_tasks
+        for t in reversed(self.order):
+            paths = {}
+            for s, offset in self.successors[t].items():
+                for (r, r_offset) in [(s, 0)] + list(longest[s].items()):
+                    if r not in paths or paths[r] < offset + r_offset:
+                        paths[r] = offset + r_offset
+            longest[t] = paths
+
+        return longest
+
+    def reduced_precedences(self):
+        # transitive reduction: a link is dropped if a longer path implies at least the same offset
+        if self.order is None:
+            return self.precedences()
+
+        if self.__reduced is None:
+            longest = self.longest_paths()
+            self.__reduced = []
+
+            for (dep, t, offset) in self.precedences():
+                implied = [s_offset + longest[s][t] for s, s_offset in self.successors[dep].items()
+                           if s != t and t in longest[s]]
+                if max(implied, default=offset - 1) < offset:
+                    self.__reduced.append((dep, t, offset))
+
+        return self.__reduced
+
+    def positive_lag(self):
+        # total waiting time of the links, added to serial schedules
+        return sum(max(dependency.lag, 0) for dependencies in self.dependencies for dependency in dependencies)
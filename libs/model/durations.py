@@ -0,0 +1,10 @@
+def max_duration(tasks):
+    # https://ru.stackoverflow.com/questions/1331510/%D0%9E%D0%B1%D1%8A%D1%8F%D1%81%D0%BD%D0%B8%D1%82%D0%B5-%D0%BA%D0%B0%D0%BA-%D1%80%D0%B0%D0%B1%D0%BE%D1%82%D0%B0%D0%B5%D1%82-%D1%8D%D1%82%D0%BE-%D0%BE%D0%BA%D1%80%D1%83%D0%B3%D0%BB%D0%B5%D0%BD%D0%B8%D0%B5-%D1%87%D0%B8%D1%81%D0%BB%D0%B0-%D0%B2-%D0%B1%D0%BE%D0%BB%D1%8C%D1%88%D1%83%D1%8E-%D1%81%D1%82%D0%BE%D1%80%D0%BE%D0%BD%D1%83
+    __HRS_PER_DAY = 8
+    tot = 0
+
+    for (name, effort_hrs, skill_required, depends_on_tasks) in tasks:
+        task_days = int(-1 * effort_hrs // __HRS_PER_DAY * -1)
+        tot += task_days
+
+    return tot
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from ortools.sat.python import cp_model
+
+# seconds between checks of an external stop event
+STOP_POLL_TIME = 0.5
+
+
+class EarlyStopSolutionCallback(cp_model.CpSolverSolutionCallback):
+    """Print & record intermediate solutions, stop the search once it stalls or on request."""
+
+    # the gap limit is left to the solver, relative_gap_limit checks the bound between solutions too
+
+    def __init__(self,
+                 solution_limit: int = None,            # stop after N solutions
+                 no_improvement_time: float = None,     # stop after seconds without a better solution
+                 events=None,                           # queue to put incumbents to, e.g. of another process
+                 stop_event=None,                       # event to stop the search, e.g. of a cancelled job
+                 stage=None                             # label of the incumbents, e.g. the objective of a stage
+                 ):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+
+        self.solution_limit = solution_limit
+        self.no_improvement_time = no_improvement_time
+        self.events = events
+        self.stop_event = stop_event
+        self.stage = stage
+
+        # incumbents[i] -> {'time', 'objective', 'bound', 'stage'} of every solution, seconds since the callback is created
+        self.incumbents = []
+        self.stop_reason = None
+
+        self.start_time = time.time()
+        self.__timer = None
+        self.__lock = threading.Lock()
+        self.__searching = True
+
+        if self.stop_event is not None:
+            watcher = threading.Thread(target=self.watch_stop_event, daemon=True)
+            watcher.start()
+
+    def on_solution_callback(self):
+        self.add_incumbent(self.ObjectiveValue(), self.BestObjectiveBound())
+
+        if self.solution_limit and len(self.incumbents) >= self.solution_limit:
+            self.stop(f'{self.solution_limit} solutions')
+        elif self.no_improvement_time:
+            self.restart_timer()
+
+    def add_incumbent(self, objective, bound):
+        # a solution of the search or a plan known before it, e.g. the completed hint
+        current_time = time.time() - self.start_time
+
+        print('Solution %i, time = %0.2f s, objective = %i' % (len(self.incumbents), current_time, objective))
+        self.incumbents.append({'time': current_time, 'objective': objective, 'bound': bound, 'stage': self.stage})
+        if self.events is not None:
+            self.events.put(self.incumbents[-1])
+
+    def restart_timer(self):
+        # solutions are only reported when they improve, so the timer runs since the last one
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+            if not self.__searching:
+                return
+
+            self.__timer = threading.Timer(self.no_improvement_time, self.stop,
+                                           args=(f'no improvement for {self.no_improvement_time} s',))
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def watch_stop_event(self):
+        # the event may be set before the solver is started, so the search is stopped until it is finished
+        while True:
+            stopped = self.stop_event.wait(STOP_POLL_TIME)
+            with self.__lock:
+                if not self.__searching:
+                    return
+                if stopped:
+                    if self.stop_reason is None:
+                        self.stop_reason = 'stopped'
+                        print('Stop search: stopped')
+                    self.StopSearch()
+
+            if stopped:
+                time.sleep(STOP_POLL_TIME)
+
+    def stop(self, reason):
+        with self.__lock:
+            # the timer may fire while the solve returns
+            if not self.__searching or self.stop_reason is not None:
+                return
+
+            self.stop_reason = reason
+            print(f'Stop search: {reason}')
+            self.StopSearch()
+
+    def finish(self):
+        # called after Solve, the solver must not be stopped any more
+        with self.__lock:
+            self.__searching = False
+            if self.__timer is not None:
+                self.__timer.cancel()
@@ -0,0 +1,161 @@
+from bisect import insort
+
+from libs.model.durations import max_duration
+from libs.model.list_scheduling import ListScheduler, WorkerRule, earliest_fit, makespan
+
+
+def ceil_div(a, b):
+    return -(-a // b)
+
+
+class HorizonEstimator:
+    """Bounds on the project duration in days, used to size the variable space of the models."""
+
+    def __init__(self,
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = []        # (task_id, start, end)
+                 ):
+        self.resources = resources
+        self.tasks = tasks
+        self.resource_constraints = resource_constraints
+        self.task_constraints = task_constraints
+
+        self.scheduler = ListScheduler(resources, tasks, fixed_assignments, resource_constraints, task_constraints)
+        self.__schedules = {}
+
+    def get_schedule(self, worker_rule: WorkerRule):
+        if worker_rule not in self.__schedules:
+            self.__schedules[worker_rule] = self.scheduler.schedule(worker_rule)
+
+        return self.__schedules[worker_rule]
+
+    def get_heads(self):
+        # heads[t] -> earliest start by dependencies, task constraints' start dates are release dates
+        heads = [0] * len(self.tasks)
+        for (task_id, start, _) in self.task_constraints:
+            if start is not None:
+                heads[task_id] = max(heads[task_id], start)
+
+        for t in self.scheduler.order:
+            for dep, offset in self.scheduler.graph.predecessors[t].items():
+                heads[t] = max(heads[t], heads[dep] + offset)
+
+        return heads
+
+    def get_windows(self, num_days):
+        # windows[t] -> (earliest start, latest finish) by dependencies, release dates & deadlines within num_days,
+        # a window shorter than the task means there is no plan of num_days
+        durations = self.scheduler.durations
+        if self.scheduler.order is None:
+            return [(0, num_days)] * len(self.tasks)
+
+        latest = [num_days - durations[t] for t in range(len(self.tasks))]
+        for (task_id, _, end) in self.task_constraints:
+            if end is not None:
+                latest[task_id] = min(latest[task_id], end - durations[task_id])
+
+        for t in reversed(self.scheduler.order):
+            for dep, offset in self.scheduler.graph.predecessors[t].items():
+                latest[dep] = min(latest[dep], latest[t] - offset)
+
+        heads = self.get_heads()
+        return [(heads[t], latest[t] + durations[t]) for t in range(len(self.tasks))]
+
+    def critical_path(self):
+        # longest dependency chain
+        if self.scheduler.order is None:
+            return 0
+
+        heads = self.get_heads()
+        return max([heads[t] + self.scheduler.durations[t] for t in range(len(self.tasks))], default=0)
+
+    def get_skill_pools(self):
+        # [(tasks, workers)] -> tasks of a skill & the workers who have it; all tasks & all workers last
+        tasks_by_skill = {}
+        for t in range(len(self.tasks)):
+            (*_, skill_required, _) = self.tasks[t]
+            if skill_required is not None and skill_required != '':
+                tasks_by_skill.setdefault(skill_required, []).append(t)
+
+        pools = [(tasks, [w for w in range(len(self.resources)) if skill in self.resources[w][2]])
+                 for skill, tasks in tasks_by_skill.items()]
+        pools.append((list(range(len(self.tasks))), list(range(len(self.resources)))))
+
+        return pools
+
+    def workload(self):
+        # work of a skill can't be done faster than by all workers who have the skill in parallel
+        bound = 0
+        for (tasks, workers) in self.get_skill_pools():
+            if workers:
+                bound = max(bound, ceil_div(sum(self.scheduler.durations[t] for t in tasks), len(workers)))
+
+        return bound
+
+    def energy(self):
+        # workload of a skill pool can't start before its earliest head & ends at least its shortest tail before the end
+        if self.scheduler.order is None:
+            return self.workload()
+
+        heads = self.get_heads()
+        tails = self.scheduler.get_tails()
+        durations = self.scheduler.durations
+
+        bound = 0
+        for (tasks, workers) in self.get_skill_pools():
+            if not workers or not tasks:
+                continue
+
+            days = ceil_div(sum(durations[t] for t in tasks), len(workers))
+            head = min(heads[t] for t in tasks)
+            tail = min(tails[t] - durations[t] for t in tasks)
+            bound = max(bound, head + days + tail)
+
+        return bound
+
+    def lower_bound(self):
+        return max(self.critical_path(), self.energy())
+
+    def serial_bound(self):
+        # every task one after another in plan order, each one on the eligible worker who finishes it last,
+        # so any assignment fits; a worker away up to the end of the known calendars is left out if another one isn't
+        if self.scheduler.order is None:
+            releases = [start for (_, start, _) in self.task_constraints if start is not None]
+            unavailable = [end + 1 - start for (_, start, end) in self.resource_constraints]
+            return (max(releases, default=0) + max_duration(self.tasks) + sum(unavailable) +
+                    self.scheduler.graph.positive_lag())
+
+        releases = [0] * len(self.tasks)
+        for (task_id, start, _) in self.task_constraints:
+            if start is not None:
+                releases[task_id] = max(releases[task_id], start)
+
+        busy = [[] for _ in range(len(self.resources))]
+        for (resource_id, start, end) in self.resource_constraints:
+            insort(busy[resource_id], (start, end + 1))
+        calendar_end = max([end + 1 for (_, _, end) in self.resource_constraints], default=0)
+
+        starts = {}
+        finish = 0
+        for t in self.scheduler.order:
+            est = max([finish, releases[t]] + [starts[dep] + offset
+                                               for dep, offset in self.scheduler.graph.predecessors[t].items()])
+            duration = self.scheduler.durations[t]
+
+            fits = [earliest_fit(busy[w], est, duration) for w in self.scheduler.get_eligible_workers(t)]
+            known = [start for start in fits if start == est or start < calendar_end]
+            starts[t] = max(known or fits or [est])
+            finish = starts[t] + duration
+
+        return finish
+
+    def upper_bound(self, worker_rule: WorkerRule = WorkerRule.EARLIEST_FINISH):
+        # makespan of a feasible greedy schedule, serial bound if the greedy one violates constraints
+        task_assignments = self.get_schedule(worker_rule)
+        if task_assignments is None:
+            return self.serial_bound()
+
+        return min(makespan(task_assignments), self.serial_bound())
@@ -0,0 +1,152 @@
+from enum import Enum
+from bisect import insort
+
+from libs.model.dependency_graph import DependencyGraph
+
+
+class PriorityRule(str, Enum):
+    LONGEST_PATH = 'path'           # longest remaining path to the end of the project first
+    SHORTEST_TASK = 'shortest'      # shortest task first
+    PLAN_ORDER = 'order'            # in order of the project plan
+
+
+class WorkerRule(str, Enum):
+    EARLIEST_FINISH = 'earliest'    # worker who finishes the task first, cheapest on ties
+    CHEAPEST = 'cheapest'           # cheapest skill-eligible worker, earliest finish on ties
+
+
+def earliest_fit(busy, est, duration):
+    # busy - sorted list of (start, end) intervals, ends are exclusive
+    start = est
+    for (b_start, b_end) in busy:
+        if b_end <= start:
+            continue
+        if b_start >= start + duration:
+            break
+        start = b_end
+
+    return start
+
+
+class ListScheduler:
+    """Serial schedule generation: tasks by priority, each one placed at the earliest feasible slot."""
+
+    def __init__(self,
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = []        # (task_id, start, end)
+                 ):
+        self.resources = resources
+        self.tasks = tasks
+        self.fixed_assignments = fixed_assignments
+        self.resource_constraints = resource_constraints
+        self.task_constraints = task_constraints
+
+        self.num_workers = len(resources)
+        self.num_tasks = len(tasks)
+
+        self.graph = DependencyGraph(tasks)
+        self.durations = self.graph.durations
+        self.order = self.graph.order
+
+    def get_eligible_workers(self, t):
+        for (task_id, resource_id) in self.fixed_assignments:
+            if task_id == t:
+                return [resource_id]
+
+        (*_, skill_required, _) = self.tasks[t]
+        if skill_required is None or skill_required == '':
+            return list(range(self.num_workers))
+
+        return [w for w in range(self.num_workers) if skill_required in self.resources[w][2]]
+
+    def get_tails(self):
+        # tails[t] -> longest path in days from the start of t to the end of the project
+        tails = list(self.durations)
+        for t in reversed(self.order):
+            for dep, offset in self.graph.predecessors[t].items():
+                tails[dep] = max(tails[dep], offset + tails[t])
+
+        return tails
+
+    def get_priority(self, priority_rule: PriorityRule):
+        # priority[t] -> the greatest is scheduled first
+        match priority_rule:
+            case PriorityRule.SHORTEST_TASK:
+                return [(-self.durations[t], -t) for t in range(self.num_tasks)]
+            case PriorityRule.PLAN_ORDER:
+                return [(-t,) for t in range(self.num_tasks)]
+
+        tails = self.get_tails()
+        return [(tails[t], -t) for t in range(self.num_tasks)]
+
+    def schedule(self,
+                 worker_rule: WorkerRule = WorkerRule.EARLIEST_FINISH,
+                 priority_rule: PriorityRule = PriorityRule.LONGEST_PATH,
+                 priority: list = None):
+        # task_assignments[t] -> (start, end, worker) or None if no feasible schedule is found;
+        # priority[t] overrides the rule, the greatest is scheduled first
+        if self.order is None:
+            return None
+
+        releases = [0] * self.num_tasks
+        deadlines = [None] * self.num_tasks
+        for (task_id, start, end) in self.task_constraints:
+            if start is not None:
+                releases[task_id] = max(releases[task_id], start)
+            if end is not None:
+                deadlines[task_id] = end if deadlines[task_id] is None else min(deadlines[task_id], end)
+
+        busy = [[] for _ in range(self.num_workers)]
+        for (resource_id, start, end) in self.resource_constraints:
+            insort(busy[resource_id], (start, end + 1))
+
+        if priority is None:
+            priority = self.get_priority(priority_rule)
+        preds_left = [len(p) for p in self.graph.predecessors]
+
+        task_assignments = {}
+        ready = [t for t in range(self.num_tasks) if preds_left[t] == 0]
+
+        while ready:
+            t = max(ready, key=lambda r: priority[r])
+            ready.remove(t)
+
+            est = max([releases[t]] + [task_assignments[dep][0] + offset
+                                       for dep, offset in self.graph.predecessors[t].items()])
+            duration = self.durations[t]
+
+            candidates = []
+            for w in self.get_eligible_workers(t):
+                start = earliest_fit(busy[w], est, duration)
+                (_, cost_hr, _) = self.resources[w]
+                match worker_rule:
+                    case WorkerRule.CHEAPEST: key = (cost_hr, start, w)
+                    case _: key = (start, cost_hr, w)
+                candidates.append((key, start, w))
+
+            if not candidates:
+                return None
+
+            (_, start, w) = min(candidates)
+            end = start + duration
+
+            if deadlines[t] is not None and end > deadlines[t]:
+                return None
+
+            task_assignments[t] = (start, end, w)
+            if duration > 0:
+                insort(busy[w], (start, end))
+
+            for s in self.graph.successors[t]:
+                preds_left[s] -= 1
+                if preds_left[s] == 0:
+                    ready.append(s)
+
+        return task_assignments
+
+
+def makespan(task_assignments):
+    return max([end for (_, end, _) in task_assignments.values()], default=0)
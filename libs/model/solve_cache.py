@@ -0,0 +1,131 @@
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+# bump when models change what a solution of the same problem looks like
+CACHE_VERSION = 1
+
+
+def normalize(value):
+    # JSON-able form that doesn't depend on dict or skills order, enums are their values
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(normalize(v) for v in value)
+    if hasattr(value, '__dict__'):
+        return normalize(vars(value))
+
+    return value
+
+
+def fingerprint(*parts):
+    canonical = json.dumps(normalize([CACHE_VERSION, *parts]), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def normalize_resources(resources):
+    return [(name, cost_hr, sorted(skills)) for (name, cost_hr, skills) in resources]
+
+
+class SolveCache:
+    """Solutions on disk by problem fingerprint, least recently used are evicted above max_size bytes."""
+
+    def __init__(self, cache_dir, max_size=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def get_keys(self, tasks, resources, fixed_assignments, resource_constraints, task_constraints, opt_mode, options):
+        # (tasks_key, key): tasks_key is shared by problems with the same tasks, key is the exact problem
+        tasks_key = fingerprint(tasks)
+        key = fingerprint(tasks, normalize_resources(resources), fixed_assignments, resource_constraints,
+                          task_constraints, opt_mode, options)
+
+        return (tasks_key, key)
+
+    def get_path(self, tasks_key, key):
+        return os.path.join(self.cache_dir, f'{tasks_key[:16]}_{key}.pkl')
+
+    def read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        # most recently used
+        os.utime(path)
+        return entry
+
+    def get(self, tasks_key, key):
+        # solution of the exact same problem or None
+        path = self.get_path(tasks_key, key)
+        if not os.path.exists(path):
+            return None
+
+        entry = self.read(path)
+        return None if entry is None else entry['solution']
+
+    def get_assignments(self, tasks_key):
+        # {task: (start, end, resource name)} of the latest solution for the same tasks, None if there is none
+        paths = glob.glob(os.path.join(self.cache_dir, f'{tasks_key[:16]}_*.pkl'))
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            entry = self.read(path)
+            if entry is not None:
+                return entry['assignments']
+
+        return None
+
+    def put(self, tasks_key, key, solution, resources):
+        # assignments by resource name, resource indices differ between problems
+        assignments = {t: (start, end, resources[w][0]) for t, (start, end, w) in solution['task_assignments'].items()}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # written aside and renamed, parallel runs never read a partial entry
+        (fd, tmp_path) = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump({'solution': solution, 'assignments': assignments}, f)
+        os.replace(tmp_path, self.get_path(tasks_key, key))
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, '*.pkl')):
+            with contextlib.suppress(FileNotFoundError):
+                entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, path) in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            # a parallel run may have evicted it already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+
+def to_task_assignments(assignments, resources, tasks):
+    # cached assignments on the current resources, tasks of removed resources or of resources without the skill
+    # any more are left unhinted
+    worker_index = {name: w for w, (name, *_) in enumerate(resources)}
+
+    task_assignments = {}
+    for t, (start, end, name) in assignments.items():
+        (*_, skill_required, _) = tasks[t]
+        if name not in worker_index:
+            continue
+        if skill_required and skill_required not in resources[worker_index[name]][2]:
+            continue
+
+        task_assignments[t] = (start, end, worker_index[name])
+
+    return task_assignments
@@ -1,5 +1,32 @@
+import json
+import os
 from collections import defaultdict
 
+# named profiles: draft, balanced, fine
+PROFILES_FILE = os.path.join(os.path.dirname(__file__), 'solver_profiles.json')
+
+
+def get_by_range(ranges: dict, value: int):
+    # ranges: {'low-hi': v, ..., 'default': v}, bounds are inclusive, default if no range matches
+    DELIMETER = '-'
+    DEFAULT = 'default'
+
+    def low_hi(interval_str: str):
+        low = int(interval_str.split(DELIMETER)[0])
+        hi = int(interval_str.split(DELIMETER)[1])
+
+        return (low, hi)
+
+    for k, v in ranges.items():
+        if k == DEFAULT:
+            continue
+
+        (low_incl, hi_incl) = low_hi(k)
+        if (low_incl <= value <= hi_incl):
+            return v
+
+    return ranges.get(DEFAULT, None)
+
 
 class SolverParams:
     def __init__(self,
@@ -7,13 +34,35 @@ class SolverParams:
                  max_iteration_search_time_by_tasks_count,
                  solution_limit,
                  num_search_workers,
-                 do_logging
+                 do_logging,
+                 anchor_search_workers=None,
+                 max_iteration_search_time_by_size=None,
+                 stage_time_split=None,
+                 relative_gap_limit=None,
+                 no_improvement_time=None,
+                 symmetry_breaking=True,
+                 redundant_constraints=False
                  ):
         self.max_iteration_search_time: float = max_iteration_search_time
         self.max_iteration_search_time_by_tasks_count: dict = max_iteration_search_time_by_tasks_count
         self.solution_limit: int = solution_limit
         self.num_search_workers: int = num_search_workers
         self.do_logging = do_logging
+        # OptimizationMode -> num_search_workers for anchor solves of weighted optimization,
+        # by default cores are split evenly between them
+        self.anchor_search_workers: dict = anchor_search_workers
+        # 'low-hi' of tasks x workers x horizon days -> seconds, max_iteration_search_time is the cap
+        self.max_iteration_search_time_by_size: dict = max_iteration_search_time_by_size
+        # shares of the time of a multi-objective run per stage, e.g. [0.6, 0.3, 0.1];
+        # by default every stage gets the whole time
+        self.stage_time_split: list = stage_time_split
+        # early stop: gap between the objective & its best bound, seconds without a better solution
+        self.relative_gap_limit: float = relative_gap_limit
+        self.no_improvement_time: float = no_improvement_time
+        # interchangeable workers (same skills, cost & unavailability) are used in order
+        self.symmetry_breaking: bool = symmetry_breaking
+        # cumulative per skill pool & energy bounds on the makespan, implied but propagated globally
+        self.redundant_constraints: bool = redundant_constraints
 
 
     @staticmethod
@@ -27,35 +76,67 @@ class SolverParams:
     @staticmethod
     def from_json(params_dict: any):
         max_iteration_search_time = params_dict.get('max_iteration_search_time', None)
-        max_iteration_search_time_by_resources = params_dict.get('max_iteration_search_time_by_resources', None)
+        max_iteration_search_time_by_tasks_count = params_dict.get('max_iteration_search_time_by_tasks_count', None)
         solution_limit = params_dict.get('solution_limit', None)
         do_logging = params_dict.get('logging', False)
         num_search_workers = params_dict.get('num_search_workers', None)
+        anchor_search_workers = params_dict.get('anchor_search_workers', None)
+        max_iteration_search_time_by_size = params_dict.get('max_iteration_search_time_by_size', None)
+        stage_time_split = params_dict.get('stage_time_split', None)
+        relative_gap_limit = params_dict.get('relative_gap_limit', None)
+        no_improvement_time = params_dict.get('no_improvement_time', None)
+        symmetry_breaking = params_dict.get('symmetry_breaking', True)
+        redundant_constraints = params_dict.get('redundant_constraints', False)
 
         return SolverParams(max_iteration_search_time = max_iteration_search_time,
-                            max_iteration_search_time_by_resources=max_iteration_search_time_by_resources,
+                            max_iteration_search_time_by_tasks_count=max_iteration_search_time_by_tasks_count,
                             solution_limit=solution_limit,
                             do_logging = do_logging,
-                            num_search_workers = num_search_workers)
+                            num_search_workers = num_search_workers,
+                            anchor_search_workers = anchor_search_workers,
+                            max_iteration_search_time_by_size = max_iteration_search_time_by_size,
+                            stage_time_split = stage_time_split,
+                            relative_gap_limit = relative_gap_limit,
+                            no_improvement_time = no_improvement_time,
+                            symmetry_breaking = symmetry_breaking,
+                            redundant_constraints = redundant_constraints)
 
-    def get_max_iteration_search_time_by_tasks_count(self, num_resources: int):
+    @staticmethod
+    def from_profile(name: str, profiles_file: str = PROFILES_FILE):
+        with open(profiles_file, 'r', encoding='utf-8') as f:
+            profiles = json.load(f)
 
-        DELIMETER = '-'
-        DEFAULT = 'default'
+        if name not in profiles:
+            raise ValueError(f"Unknown solver profile '{name}', expected one of: {', '.join(profiles)}")
 
-        def low_hi(interval_str: str):
-            low = int(interval_str.split(DELIMETER)[0])
-            hi = int(interval_str.split(DELIMETER)[1])
+        return SolverParams.from_json(profiles[name])
 
-            return (low, hi)
+    def get_max_iteration_search_time_by_tasks_count(self, num_tasks: int):
+        if self.max_iteration_search_time_by_tasks_count is not None:
+            max_time = get_by_range(self.max_iteration_search_time_by_tasks_count, num_tasks)
+            if max_time is not None:
+                return max_time
 
-        if self.max_iteration_search_time_by_resources is not None:
-            for k, v in self.max_iteration_search_time_by_resources.items():
-                if k == DEFAULT:
-                    return v
+        return self.max_iteration_search_time
 
-                (low_incl, hi_incl) = low_hi(k)
-                if (low_incl <= num_resources <= hi_incl):
-                    return v
+    def get_max_iteration_search_time(self, num_tasks: int, num_workers: int, num_days: int):
+        # small problems get seconds, only big ones the whole max_iteration_search_time
+        if self.max_iteration_search_time_by_size is not None:
+            max_time = get_by_range(self.max_iteration_search_time_by_size, num_tasks * num_workers * num_days)
+        else:
+            max_time = self.get_max_iteration_search_time_by_tasks_count(num_tasks)
 
-        return self.max_iteration_search_time
+        if max_time is None:
+            return self.max_iteration_search_time
+        if self.max_iteration_search_time:
+            return min(max_time, self.max_iteration_search_time)
+
+        return max_time
+
+    def get_stage_time(self, max_time: float, stage: int, num_stages: int):
+        # share of the stage among the stages of the run
+        if not self.stage_time_split or max_time is None or num_stages <= 1:
+            return max_time
+
+        split = (list(self.stage_time_split) + [self.stage_time_split[-1]] * num_stages)[:num_stages]
+        return max_time * split[stage] / sum(split)
@@ -1,23 +1,67 @@
+import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
 
+import numpy as np
 from ortools.sat.python import cp_model
 from ortools.sat.python.cp_model import IntVar
 
-from libs.model.objective_solution_printer_with_limit import ObjectiveSolutionPrinterWithLimit
+from libs.model.durations import max_duration
+from libs.model.horizon import HorizonEstimator
+from libs.model.list_scheduling import WorkerRule
+from libs.model.early_stop_callback import EarlyStopSolutionCallback
 from libs.model.solver_params import SolverParams
+from libs.model.telemetry import telemetry
 
 
-def max_duration(tasks):
-    # https://ru.stackoverflow.com/questions/1331510/%D0%9E%D0%B1%D1%8A%D1%8F%D1%81%D0%BD%D0%B8%D1%82%D0%B5-%D0%BA%D0%B0%D0%BA-%D1%80%D0%B0%D0%B1%D0%BE%D1%82%D0%B0%D0%B5%D1%82-%D1%8D%D1%82%D0%BE-%D0%BE%D0%BA%D1%80%D1%83%D0%B3%D0%BB%D0%B5%D0%BD%D0%B8%D0%B5-%D1%87%D0%B8%D1%81%D0%BB%D0%B0-%D0%B2-%D0%B1%D0%BE%D0%BB%D1%8C%D1%88%D1%83%D1%8E-%D1%81%D1%82%D0%BE%D1%80%D0%BE%D0%BD%D1%83
-    __HRS_PER_DAY = 8
-    tot = 0
+# seconds to complete a hint into a plan with its variables fixed
+HINT_TIME = 5
 
-    for (name, effort_hrs, skill_required, depends_on_tasks) in tasks:
-        task_days = int(-1 * effort_hrs // __HRS_PER_DAY * -1)
-        tot += task_days
 
-    return tot
+def fill_totals(tasks, resources, solution):
+    tot_days = 0
+    tot_workers = {}
+    tot_cost = 0
+    for t in solution['task_assignments']:
+        (start, end, assigned_worker) = solution['task_assignments'][t]
+
+        if end > tot_days:
+            tot_days = end
+
+        tot_workers[assigned_worker] = True
+
+        (_, effort_hrs, _, _) = tasks[t]
+        (_, cost_hr, _) = resources[assigned_worker]
+        tot_cost += int(effort_hrs) * int(cost_hr)
+
+    solution['duration'] = tot_days
+    solution['cost'] = tot_cost
+    solution['resources'] = len(tot_workers)
+
+    return solution
+
+
+def to_workers_assignments(num_workers, task_assignments):
+    # workers_assignments[w] -> [(day, task)] ordered by day
+    workers_assignments = {w: [] for w in range(num_workers)}
+    for t, (start, end, w) in task_assignments.items():
+        workers_assignments[w].extend((d, t) for d in range(start, end))
+
+    for w in workers_assignments:
+        workers_assignments[w].sort()
+
+    return workers_assignments
+
+
+def match_keys(keys, index, hint_keys, hint_values):
+    # (variables, values) of the keys hinted in another build, keys are rows of (t, d, w)
+    if len(keys) == 0 or len(hint_keys) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    dims = tuple(np.maximum(keys.max(axis=0), hint_keys.max(axis=0)) + 1)
+    (_, i, j) = np.intersect1d(np.ravel_multi_index(keys.T, dims), np.ravel_multi_index(hint_keys.T, dims),
+                               assume_unique=True, return_indices=True)
+    return index[i], hint_values[j]
 
 
 class TaskSchedulingBase(ABC):
@@ -34,8 +78,10 @@ class TaskSchedulingBase(ABC):
 
         # Variable space
         self.task_intervals = None      # task_intervals[t] -> IntervalVar
+        self.task_starts = None         # task_starts[t] -> IntVar
         self.task_day_workers = None    # task_day_workers[t, d, w] -> tasks x days x workers
         self.task_workers = None        # task_workers[t, w] -> tasks x workers
+        self.zero = None                # shared constant 0 of the pruned task_workers
 
         self.resources = resources
         self.tasks = tasks
@@ -46,35 +92,85 @@ class TaskSchedulingBase(ABC):
         self.num_workers = len(resources)
         self.num_tasks = len(tasks)
 
-        self.num_days = max_duration(tasks)
+        # days horizon: [min_days, num_days], set up per objective in build_model
+        self.horizon = HorizonEstimator(resources, tasks, fixed_assignments, resource_constraints, task_constraints)
+        self.graph = self.horizon.scheduler.graph
+        self.min_days = 0
+        self.num_days = self.horizon.serial_bound()
+
+        # var_index[key] -> NumPy array of model variable indices, solutions & hints are read in batches by the same keys
+        self.var_index = None
+        # var_keys[key] -> (n, 3) NumPy array of (t, d, w) of a sparse var_index[key], which is flat
+        self.var_keys = None
+        self.durations = np.array(self.graph.durations, dtype=np.int64)
+
+        # task_assignments[t] -> (start, end, worker) of a known schedule, e.g. a heuristic one, to hint the solver
+        self.warm_start = None
+        # task_assignments[t] -> (start, end, worker) of the previous plan, changes to it are minimized by MinDeviationModel
+        self.baseline = None
+        # duration of a known feasible plan, caps the horizon, e.g. of LNS sub-problems
+        self.max_days = None
+        # progress of the solves, e.g. of a service job: queue of incumbents & an event to stop the search
+        self.events = None
+        self.stop_event = None
 
         self.__solver_params = solver_params
 
-    def get_hints(self, solver):
-        hints = {
-            'task_intervals': {},
-            'task_workers': {},
-            'task_day_workers': {}
+    def index_variables(self):
+        # called at the end of build_model, when the variable space is known
+        self.var_index = {
+            'task_starts': np.array([self.task_starts[t].Index() for t in range(self.num_tasks)], dtype=np.int64),
+            'task_workers': np.array([[self.task_workers[t, w].Index() for w in range(self.num_workers)]
+                                      for t in range(self.num_tasks)], dtype=np.int64).reshape(self.num_tasks, self.num_workers)
         }
 
-        for t in range(self.num_tasks):
-            start = solver.Value(self.task_intervals[t].StartExpr())
-            end = solver.Value(self.task_intervals[t].EndExpr())
-            duration = solver.Value(self.task_intervals[t].SizeExpr())
-            hints['task_intervals'][t] = (start, end, duration)
+        self.var_keys = {}
+        if self.task_day_workers is not None:
+            # only the days of the task windows & eligible workers have variables, they are indexed by their keys
+            self.var_keys['task_day_workers'] = np.array(list(self.task_day_workers.keys()),
+                                                         dtype=np.int64).reshape(-1, 3)
+            self.var_index['task_day_workers'] = np.array([v.Index() for v in self.task_day_workers.values()],
+                                                          dtype=np.int64)
 
-        for t in range(self.num_tasks):
-            for w in range(self.num_workers):
-                works = solver.Value(self.task_workers[t, w])
-                hints['task_workers'][t, w] = works
+    def get_values(self, solver):
+        # values[key] -> array shaped as var_index[key], the whole solution is read at once
+        solution = np.array(solver.ResponseProto().solution, dtype=np.int64)
+        return {key: solution[index] for key, index in self.var_index.items()}
 
-        for w in range(self.num_workers):
-            for d in range(self.num_days):
-                for t in range(self.num_tasks):
-                    works = solver.boolean_value(self.task_day_workers[t, d, w])
-                    hints['task_day_workers'][t, d, w] = works
+    def to_hints(self, values):
+        # hints[key] -> values, (keys, values) of the sparse keys, another build has other keys
+        return {key: (self.var_keys[key], v) if key in self.var_keys else v for key, v in values.items()}
+
+    def get_hints(self, solver):
+        return self.to_hints(self.get_values(solver))
+
+    def add_hints(self, model, hints):
+        # hints of a previous build may have a different horizon, only the common days are hinted
+        variables = []
+        values = []
+        for key, index in self.var_index.items():
+            if key not in hints:
+                continue
+
+            if key in self.var_keys:
+                (hint_keys, hint_values) = hints[key]
+                (index, hint_values) = match_keys(self.var_keys[key], index, hint_keys, hint_values)
+                variables.append(index)
+                values.append(hint_values)
+                continue
 
-        return hints
+            common = tuple(slice(0, min(a, b)) for a, b in zip(index.shape, hints[key].shape))
+            variables.append(index[common].ravel())
+            values.append(hints[key][common].ravel())
+
+        if not variables:
+            return
+
+        # shared constants have a single index, each variable is hinted once
+        (variables, first) = np.unique(np.concatenate(variables), return_index=True)
+        hint = model.Proto().solution_hint
+        hint.vars.extend(variables.tolist())
+        hint.values.extend(np.concatenate(values)[first].tolist())
 
     @abstractmethod
     def get_objective(self, model):
@@ -84,32 +180,70 @@ class TaskSchedulingBase(ABC):
     def preprocess_model(self, model):
         pass
 
+    def get_num_days(self):
+        # any assignment can be scheduled serially
+        return self.horizon.serial_bound()
+
+    def setup_horizon(self):
+        self.min_days = self.horizon.lower_bound()
+        self.num_days = max(self.get_num_days(), self.min_days)
+
+        if self.max_days:
+            self.num_days = min(self.num_days, max(self.max_days, self.min_days))
+
+    def is_eligible(self, t, w):
+        (*_, skill_required, _) = self.tasks[t]
+        (*_, skills) = self.resources[w]
+
+        return skill_required is None or skill_required == '' or skill_required in skills
+
+    def add_start(self, model, t, window):
+        # start within the task window, a window shorter than the task makes the model infeasible
+        (earliest, latest) = window
+        t_duration = int(self.durations[t])
+
+        start = model.NewIntVar(earliest, max(latest - t_duration, earliest), f'start_task{t}')
+        if latest - t_duration < earliest:
+            model.Add(start <= latest - t_duration)
+
+        return start
+
     def build_model(self):
+        self.setup_horizon()
+
         model = cp_model.CpModel()
         # Variables space:
         self.task_intervals = {}
-        task_starts = {}
+        self.task_starts = {}
         task_durations = {}
         # day_overlaps [t, d] -> tasks x days, task is performed on a day
         day_overlaps = {}
         # task_workers [t, w] -> tasks x workers
         self.task_workers = {}
-        # task_day_workers [t, d, w] -> tasks x days x workers
+        # task_day_workers [t, d, w] -> tasks x days x workers, days of the task window & skill-eligible workers only
         self.task_day_workers = {}
+        # worker_days [w, d] -> tasks a worker may do on a day
+        worker_days = defaultdict(list)
+        self.zero = model.NewConstant(0)
+
+        # earliest start & latest finish of every task by the critical path method
+        windows = self.horizon.get_windows(self.num_days)
+        days = {t: range(windows[t][0], max(windows[t][1], windows[t][0])) for t in range(self.num_tasks)}
 
-        # 1. Construct variable space
+        # 1. Construct variable space, task should be finished within its window,
+        #    so it is performed on none of the days out of it
         for t in range(self.num_tasks):
             t_duration = max_duration([self.tasks[t]])
 
-            start = model.NewIntVar(0, self.num_days, f'start_task{t}')
+            start = self.add_start(model, t, windows[t])
             interval = model.NewFixedSizedIntervalVar(start, t_duration, f'interval_task{t}')
             end = interval.EndExpr()
 
             self.task_intervals[t] = interval
-            task_starts[t] = start
+            self.task_starts[t] = start
             task_durations[t] = t_duration
 
-            for d in range(self.num_days):
+            for d in days[t]:
                 overlap_d = model.NewBoolVar(f'overlap_t{t}_d{d}')
                 before_d = model.NewBoolVar(f'before_t{t}_d{d}')
                 after_d = model.NewBoolVar(f'after_t{t}_d{d}')
@@ -123,59 +257,53 @@ class TaskSchedulingBase(ABC):
                 model.Add(overlap_d + before_d + after_d == 1)
                 day_overlaps[t, d] = overlap_d
 
-        # 2. Add dependencies on intervals
-        for t in range(self.num_tasks):
-            (*_, depends_on_tasks) = self.tasks[t]
-
-            for dep in depends_on_tasks:
-                interval = self.task_intervals[t]  # this interval
-                dependency = self.task_intervals[dep]
+        # 2. Add dependencies on intervals, links implied by longer paths are left out
+        for (dep, t, offset) in self.graph.reduced_precedences():
+            interval = self.task_intervals[t]  # this interval
+            dependency = self.task_intervals[dep]
 
-                model.Add(interval.StartExpr() >= dependency.EndExpr())  # intervals are open-ended
+            model.Add(interval.StartExpr() >= dependency.StartExpr() + offset)
 
         # 3. Daily constraints
-        # 3.0 task x daily x *worker space + task x worker space
+        # 3.0 task x daily x *worker space + task x worker space, see 4. for ineligible workers
         for t in range(self.num_tasks):
             for w in range(self.num_workers):
+                if not self.is_eligible(t, w):
+                    continue
+
                 self.task_workers[t, w] = model.NewBoolVar(f'task{t}_worker{w}')
 
-                for d in range(self.num_days):
+                for d in days[t]:
                     self.task_day_workers[t, d, w] = model.NewBoolVar(f'task{t}_day{d}_worker{w}')
+                    worker_days[w, d].append(self.task_day_workers[t, d, w])
 
                 # link dimensions
-                days = [self.task_day_workers[t, d, w] for d in range(self.num_days)]
-                model.Add(sum(days) > 0).OnlyEnforceIf(self.task_workers[t, w])
-                model.Add(sum(days) == 0).OnlyEnforceIf(self.task_workers[t, w].Not())
+                works = [self.task_day_workers[t, d, w] for d in days[t]]
+                model.Add(sum(works) > 0).OnlyEnforceIf(self.task_workers[t, w])
+                model.Add(sum(works) == 0).OnlyEnforceIf(self.task_workers[t, w].Not())
         # 3.1 Task should be done by a single worker at a day if task is being performed
         #     and by nobody if it is not
         for t in range(self.num_tasks):
-            for d in range(self.num_days):
-                works = [self.task_day_workers[t, d, w] for w in range(self.num_workers)]
+            for d in days[t]:
+                works = [self.task_day_workers[t, d, w] for w in range(self.num_workers)
+                         if (t, d, w) in self.task_day_workers]
 
                 model.Add(sum(works) == 1).OnlyEnforceIf(day_overlaps[t, d])
                 model.Add(sum(works) == 0).OnlyEnforceIf(day_overlaps[t, d].Not())
         # 3.2 Worker can work on a single task at max a day
-        for w in range(self.num_workers):
-            for d in range(self.num_days):
-                tasks = [self.task_day_workers[t, d, w] for t in range(self.num_tasks)]
-
+        for tasks in worker_days.values():
+            if len(tasks) > 1:
                 model.Add(sum(tasks) <= 1)
         # 3.3 only 1 worker should work on the task
         for t in range(self.num_tasks):
-            works = [self.task_workers[t, w] for w in range(self.num_workers)]
+            works = [self.task_workers[t, w] for w in range(self.num_workers) if (t, w) in self.task_workers]
             model.AddExactlyOne(works)
 
-        # 4. Skills matching
+        # 4. Skills matching: ineligible pairs have no variables, task_workers are constant 0
         for t in range(self.num_tasks):
-            (*_, skill_required, _) = self.tasks[t]
-
-            if skill_required is None or skill_required == '':
-                continue
-
             for w in range(self.num_workers):
-                (*_, skills) = self.resources[w]
-                if skill_required not in skills:
-                    model.Add(self.task_workers[t, w] == 0)
+                if (t, w) not in self.task_workers:
+                    self.task_workers[t, w] = self.zero
 
         # 5. Fixed assignments should be met
         for (t, w_preferred) in self.fixed_assignments:
@@ -183,108 +311,284 @@ class TaskSchedulingBase(ABC):
 
         # 6. Resource constraints - can't work on specific date, e.g. on vacation
         for (resource_id, start, end) in self.resource_constraints:
-            works = [self.task_day_workers[t, d, resource_id].Not() for t in range(self.num_tasks) for d in range(start, end+1)]
+            works = [self.task_day_workers[t, d, resource_id].Not() for d in range(start, min(end+1, self.num_days))
+                     for t in range(self.num_tasks) if (t, d, resource_id) in self.task_day_workers]
             model.AddBoolAnd(works)
 
         # 7. Task constraints - should be done within a specific date ranges
         for (task_id, start, end) in self.task_constraints:
             if start is not None:
-                model.Add(task_starts[task_id] >= start)
+                model.Add(self.task_starts[task_id] >= start)
             if end is not None:
-                model.Add((task_starts[task_id] + task_durations[task_id]) <= end)
+                model.Add((self.task_starts[task_id] + task_durations[task_id]) <= end)
+
+        # 8. Interchangeable workers are used in order
+        self.add_symmetry_breaking(model)
+
+        # 9. Redundant capacity of skill pools
+        if self.__solver_params.redundant_constraints:
+            self.add_redundant_constraints(model)
+
+        self.index_variables()
+        self.add_warm_start(model)
 
         return model
 
+    def set_warm_start(self, task_assignments):
+        self.warm_start = task_assignments
 
-    def to_results(self, solver):
-        solution = {
-            'objective_value': solver.objective_value,
-            '__hints': {},
-            'task_assignments': {},
-            'workers_assignments': {},
-            'tot_days': 0,
-            'tot_workers': 0,
-            'tot_cost': 0
-        }
+    def set_baseline(self, task_assignments):
+        self.baseline = task_assignments
 
-        for t in range(self.num_tasks):
-            start = solver.Value(self.task_intervals[t].StartExpr())
-            end = solver.Value(self.task_intervals[t].EndExpr())
+    def set_max_days(self, num_days):
+        self.max_days = num_days
 
-            assigned_worker = -1
+    def set_progress(self, events=None, stop_event=None):
+        # both may be proxies of a multiprocessing manager, models are copied to anchor processes
+        self.events = events
+        self.stop_event = stop_event
 
-            for w in range(self.num_workers):
-                # first match is the answer
-                if solver.Value(self.task_workers[t, w]):
-                    assigned_worker = w
-                    break
+    def get_worker_classes(self):
+        # interchangeable workers: same skills, cost & unavailability, none of them fixed to a task;
+        # workers of a baseline plan are never interchangeable, changes are counted per worker
+        if not self.__solver_params.symmetry_breaking or self.baseline:
+            return []
 
-            solution['task_assignments'][t] = (start, end, assigned_worker)
+        fixed = {w for (_, w) in self.fixed_assignments}
+        unavailable = defaultdict(list)
+        for (w, start, end) in self.resource_constraints:
+            unavailable[w].append((start, end))
 
-        for w in range(self.num_workers):
-            worker_solution = []
-            for d in range(self.num_days):
-                for t in range(self.num_tasks):
-                    if solver.boolean_value(self.task_day_workers[t, d, w]):
-                        worker_solution.append((d, t))
+        classes = {}
+        for w, (_, cost_hr, skills) in enumerate(self.resources):
+            if w in fixed:
+                continue
+
+            key = (tuple(sorted(skills)), cost_hr, tuple(sorted(unavailable[w])))
+            classes.setdefault(key, []).append(w)
+
+        return [workers for workers in classes.values() if len(workers) > 1]
+
+    def get_class_tasks(self, workers):
+        # tasks the workers of a class are eligible for, in index order
+        (*_, skills) = self.resources[workers[0]]
+        return [t for t in range(self.num_tasks) if self.tasks[t][2] is None or self.tasks[t][2] == ''
+                or self.tasks[t][2] in skills]
+
+    def add_symmetry_breaking(self, model):
+        # value precedence: a worker of a class takes a task only if the previous worker of the class
+        # has an earlier one, so workers of a class are used in order of their first tasks
+        for workers in self.get_worker_classes():
+            # used[j] -> worker j of the class has one of the tasks so far
+            used = None
+            for t in self.get_class_tasks(workers):
+                works = [self.task_workers[t, w] for w in workers]
+                if used is None:
+                    model.AddBoolAnd([w.Not() for w in works[1:]])
+                    used = works[:-1]
+                    continue
+
+                for j in range(1, len(workers)):
+                    model.AddImplication(works[j], used[j - 1])
+
+                next_used = []
+                for j in range(len(workers) - 1):
+                    used_j = model.NewBoolVar(f'class_worker{workers[j]}_used_task{t}')
+                    model.AddMaxEquality(used_j, [used[j], works[j]])
+                    next_used.append(used_j)
+                used = next_used
+
+    def get_unavailable_ranges(self):
+        # resource constraints with overlapping ranges of a worker merged, a worker is one unit of a pool
+        ranges = []
+        for (resource_id, start, end) in sorted(self.resource_constraints):
+            if ranges and ranges[-1][0] == resource_id and start <= ranges[-1][2] + 1:
+                ranges[-1] = (resource_id, ranges[-1][1], max(ranges[-1][2], end))
+            else:
+                ranges.append((resource_id, start, end))
+
+        return ranges
+
+    def add_redundant_constraints(self, model):
+        # tasks of a skill at a time are at most the workers with the skill available then,
+        # implied by the per worker constraints, but propagated globally
+        for (tasks, workers) in self.horizon.get_skill_pools():
+            if not workers or len(tasks) <= len(workers):
+                continue
 
-            solution['workers_assignments'][w] = worker_solution
+            intervals = [self.task_intervals[t] for t in tasks]
+            for (resource_id, start, end) in self.get_unavailable_ranges():
+                if resource_id in workers:
+                    intervals.append(model.NewIntervalVar(start, end + 1 - start, end + 1,
+                                                          f'pool_unavailable_worker{resource_id}_{start}_{end}'))
+
+            model.AddCumulative(intervals, [1] * len(intervals), len(workers))
+
+    def to_canonical(self, task_assignments):
+        # same plan with workers of a class renamed in order of their first tasks, as symmetry breaking requires
+        renames = {}
+        for workers in self.get_worker_classes():
+            first = {}
+            for t in self.get_class_tasks(workers):
+                if t in task_assignments and task_assignments[t][2] in workers:
+                    first.setdefault(task_assignments[t][2], t)
+
+            ordered = sorted(workers, key=lambda w: first.get(w, self.num_tasks))
+            renames.update({w: workers[j] for j, w in enumerate(ordered)})
+
+        return {t: (start, end, renames.get(w, w)) for t, (start, end, w) in task_assignments.items()}
+
+    def add_warm_start(self, model):
+        # partial hint: starts & assigned workers, solver completes the rest;
+        # ineligible workers are the shared constant 0, which can't be hinted more than once;
+        # tasks out of the horizon or of their window are left to the solver
+        if not self.warm_start:
+            return
+
+        skipped = 0
+        for t, (start, end, w) in self.to_canonical(self.warm_start).items():
+            domain = cp_model.Domain.from_flat_intervals(self.task_starts[t].Proto().domain)
+            if end > self.num_days or not self.is_eligible(t, w) or not domain.contains(start):
+                skipped += 1
+                continue
 
-        solution['__hints'] = self.get_hints(solver)
+            model.AddHint(self.task_intervals[t].StartExpr(), start)
+            model.AddHint(self.task_workers[t, w], 1)
 
-        tot_days = 0
-        tot_workers = {}
-        tot_cost = 0
-        for t in solution['task_assignments']:
-            (start, end, assigned_worker) = solution['task_assignments'][t]
+            if self.task_day_workers:
+                for d in range(start, end):
+                    if (t, d, w) in self.task_day_workers:
+                        model.AddHint(self.task_day_workers[t, d, w], 1)
 
-            if end > tot_days:
-                tot_days = end
+        if skipped:
+            print(f"Warm start doesn't fit the model: {skipped} tasks out of the horizon or their windows aren't hinted")
 
-            tot_workers[assigned_worker] = True
+    def hint_solution(self, model, solver):
+        # whole previous solution as a hint, e.g. to warm start the next solve of the same model
+        model.ClearHints()
+        hint = model.Proto().solution_hint
+        hint.vars.extend(range(len(model.Proto().variables)))
+        hint.values.extend(solver.ResponseProto().solution)
 
-            (_, effort_hrs, _, _) = self.tasks[t]
-            (_, cost_hr, _) = self.resources[assigned_worker]
-            tot_cost += int(effort_hrs) * int(cost_hr)
+    def solve_hint(self, model, max_time=None):
+        # the hint completed with the hinted variables fixed: a complete hint is the first incumbent of the search
+        # and the plan if the search finds none; None if there is no hint or it doesn't fit the model
+        if not model.Proto().solution_hint.vars:
+            return None
+
+        solver = cp_model.CpSolver()
+        self.setup_solver_params(solver, max_time=min(max_time or HINT_TIME, HINT_TIME))
+        solver.parameters.fix_variables_to_their_hinted_value = True
+        with telemetry.phase('solve_hint', model=type(self).__name__):
+            status = solver.Solve(model)
+        if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+            print(f'Hint is not a feasible plan ({solver.StatusName(status)}), the solver repairs it\n')
+            return None
+
+        self.hint_solution(model, solver)
+        return solver
+
+    def to_results(self, solver):
+        values = self.get_values(solver)
+        starts = values['task_starts']
+        ends = starts + self.durations
+        # exactly one worker per task
+        workers = values['task_workers'].argmax(axis=1)
+
+        task_assignments = {t: (int(starts[t]), int(ends[t]), int(workers[t])) for t in range(self.num_tasks)}
+
+        solution = {
+            'objective_value': solver.objective_value,
+            '__hints': self.to_hints(values),
+            'task_assignments': task_assignments,
+            'workers_assignments': to_workers_assignments(self.num_workers, task_assignments),
+            'tot_days': 0,
+            'tot_workers': 0,
+            'tot_cost': 0
+        }
+
+        return self.fill_totals(solution)
 
-        solution['duration'] = tot_days
-        solution['cost'] = tot_cost
-        solution['resources'] = len(tot_workers)
+    def fill_totals(self, solution):
+        return fill_totals(self.tasks, self.resources, solution)
 
-        return solution
+    def get_solver_params(self):
+        return self.__solver_params
 
-    def setup_solver_params(self, solver):
-        if self.__solver_params.max_iteration_search_time:
-            solver.parameters.max_time_in_seconds = self.__solver_params.max_iteration_search_time
+    def set_solver_params(self, solver_params: SolverParams):
+        self.__solver_params = solver_params
+
+    def get_stage(self):
+        # (stage, num_stages) of a multi-objective run, stages share the time budget
+        return (0, 1)
+
+    def get_stage_name(self):
+        # label of the incumbents of a stage, objectives of the stages of a run are on different scales
+        return None
+
+    def get_max_time(self, stage=0, num_stages=1):
+        # time budget by problem size, a share of it for a stage
+        max_time = self.__solver_params.get_max_iteration_search_time(self.num_tasks, self.num_workers, self.num_days)
+        return self.__solver_params.get_stage_time(max_time, stage, num_stages)
+
+    def setup_solver_params(self, solver, stage=0, num_stages=1, max_time=None):
+        # the stage's time budget unless max_time is given, the search stops at the gap limit
+        if max_time is None:
+            max_time = self.get_max_time(stage, num_stages)
+        if max_time:
+            solver.parameters.max_time_in_seconds = max_time
+        if self.__solver_params.relative_gap_limit is not None:
+            solver.parameters.relative_gap_limit = self.__solver_params.relative_gap_limit
         if self.__solver_params.num_search_workers:
-            solver.num_search_workers = self.__solver_params.num_search_workers
+            solver.parameters.num_search_workers = self.__solver_params.num_search_workers
         if self.__solver_params.do_logging:
             solver.parameters.log_search_progress = self.__solver_params.do_logging
 
     def get_printer(self):
-        if self.__solver_params.solution_limit:
-            solution_printer = ObjectiveSolutionPrinterWithLimit(self.__solver_params.solution_limit)
-        else:
-            solution_printer = cp_model.ObjectiveSolutionPrinter()
-
-        return solution_printer
+        # prints & records incumbents, stops the search after the solution limit or once it stalls
+        return EarlyStopSolutionCallback(solution_limit=self.__solver_params.solution_limit,
+                                         no_improvement_time=self.__solver_params.no_improvement_time,
+                                         events=self.events, stop_event=self.stop_event,
+                                         stage=self.get_stage_name())
 
     def solve(self):
-        model = self.build_model()
-        self.preprocess_model(model)
-        model.minimize(self.get_objective(model))
+        name = type(self).__name__
+        with telemetry.phase('build_model', model=name):
+            model = self.build_model()
+        with telemetry.phase('preprocess_model', model=name):
+            self.preprocess_model(model)
+        with telemetry.phase('get_objective', model=name):
+            model.minimize(self.get_objective(model))
+
+        max_time = self.get_max_time(*self.get_stage())
+        hint_start = time.time()
+        hint_solver = self.solve_hint(model, max_time)
+        if max_time:
+            max_time = max(max_time - (time.time() - hint_start), 1)
 
         solver = cp_model.CpSolver()
 
-        self.setup_solver_params(solver)
+        self.setup_solver_params(solver, max_time=max_time)
         solution_printer = self.get_printer()
 
         print("Solving started...")
-        status = solver.Solve(model, solution_printer)
+        if hint_solver is not None:
+            solution_printer.add_incumbent(hint_solver.objective_value, hint_solver.best_objective_bound)
+        with telemetry.phase('solve', model=name):
+            status = solver.Solve(model, solution_printer)
+        solution_printer.finish()
+        telemetry.add_solve(name, model, solver, solution_printer)
+
+        if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE and hint_solver is not None:
+            print('No better solution found, the hint is kept')
+            (solver, status) = (hint_solver, cp_model.FEASIBLE)
 
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
             print(f'Solution found. Total objective func = {solver.objective_value}\n')
-            return self.to_results(solver)
+            with telemetry.phase('to_results', model=name):
+                solution = self.to_results(solver)
+            solution['incumbents'] = solution_printer.incumbents
+            return solution
         else:
             print("No solution found.")
             return None
@@ -294,6 +598,10 @@ class MinCostModel(TaskSchedulingBase):
     def preprocess_model(self, model):
         pass
 
+    def get_num_days(self):
+        # cost doesn't depend on timing: cheapest workers' greedy schedule contains an optimum
+        return self.horizon.upper_bound(WorkerRule.CHEAPEST)
+
     def get_objective(self, model):
         # Objective - Min cost
         obj_task_costs = {}
@@ -331,10 +639,16 @@ class MinDurationModel(TaskSchedulingBase):
     def preprocess_model(self, model):
         pass
 
+    def get_num_days(self):
+        # greedy schedule is feasible, so optimum can't be longer
+        return self.horizon.upper_bound()
+
     def get_objective(self, model):
         # Objective - Min Duration
 
-        root_end = model.NewIntVar(0, self.num_days, f'root_end')
+        # critical path & energy bounds hold for any horizon, the intervals engine doesn't set up min_days
+        min_days = min(max(self.min_days, self.horizon.lower_bound()), self.num_days)
+        root_end = model.NewIntVar(min_days, self.num_days, f'root_end')
 
         for t in range(self.num_tasks):
             task_interval = self.task_intervals[t]
@@ -342,4 +656,40 @@ class MinDurationModel(TaskSchedulingBase):
 
             model.Add(task_end <= root_end)
 
+        if self.get_solver_params().redundant_constraints:
+            self.add_energy_bounds(model, root_end)
+
         return root_end
+
+    def add_energy_bounds(self, model, root_end):
+        # work of a skill pool fits between its earliest start and the end minus its shortest tail
+        tails = self.horizon.scheduler.get_tails() if self.graph.order is not None else list(self.durations)
+
+        for (tasks, workers) in self.horizon.get_skill_pools():
+            if not workers or len(tasks) <= len(workers):
+                continue
+
+            energy = sum(int(self.durations[t]) for t in tasks)
+            tail = min(tails[t] - int(self.durations[t]) for t in tasks)
+
+            first_start = model.NewIntVar(0, self.num_days, f'first_start_{len(tasks)}x{len(workers)}')
+            model.AddMinEquality(first_start, [self.task_starts[t] for t in tasks])
+            model.Add(len(workers) * (root_end - tail - first_start) >= energy)
+
+
+class MinDeviationModel(TaskSchedulingBase):
+    def preprocess_model(self, model):
+        pass
+
+    def get_objective(self, model):
+        # Objective - Min changes to the baseline plan: days a task is moved by,
+        # plus the duration of a task given to another worker
+        deviations = []
+        for t, (start, _, w) in (self.baseline or {}).items():
+            shift = model.NewIntVar(0, max(self.num_days, start), f'shift_task{t}')
+            model.AddAbsEquality(shift, self.task_starts[t] - start)
+
+            deviations.append(shift)
+            deviations.append(int(self.durations[t]) * (1 - self.task_workers[t, w]))
+
+        return sum(deviations)
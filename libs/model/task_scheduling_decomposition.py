@@ -0,0 +1,229 @@
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from libs.model.dependency_graph import DependencyGraph, to_dependency
+from libs.model.list_scheduling import ListScheduler, makespan
+from libs.model.solver_params import SolverParams
+from libs.model.task_scheduling import fill_totals, to_workers_assignments
+from libs.model.task_scheduling_multiopt import OptimizationMode
+
+
+# share of the time limit for the parts, the rest is for the master solve of the merged plan
+PARTS_TIME_SHARE = 0.5
+
+
+def solve_part(model_cls, resources, tasks, kwargs, solver_params):
+    # runs in a pool process, task_assignments of the part or None
+    model = model_cls(resources, tasks, solver_params=solver_params, **kwargs)
+    solution = model.solve()
+
+    return None if solution is None else solution['task_assignments']
+
+
+def group_components(components, workloads, num_groups):
+    # longest processing time first: the biggest component goes to the least loaded group
+    groups = [[] for _ in range(num_groups)]
+    loads = [0] * num_groups
+    for component in sorted(components, key=lambda c: -sum(workloads[t] for t in c)):
+        g = loads.index(min(loads))
+        groups[g].extend(component)
+        loads[g] += sum(workloads[t] for t in component)
+
+    return [sorted(group) for group in groups if group]
+
+
+class TaskSchedulingDecomposition:
+    """Independent workstreams (precedence components) solved in parallel, merged, repaired and re-solved as a whole."""
+
+    def __init__(self,
+                 model_cls,                         # TaskSchedulingMultiOpt-like model to solve the parts with
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 opt_mode: list,
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = [],       # (task_id, start, end)
+                 solver_params: SolverParams = SolverParams.default(),
+                 max_parts: int = 0                 # parts solved in parallel, by default as many as cores & skill pools allow
+                 ):
+        self.model_cls = model_cls
+        self.resources = resources
+        self.tasks = tasks
+        self.opt_mode = opt_mode
+        self.fixed_assignments = fixed_assignments
+        self.resource_constraints = resource_constraints
+        self.task_constraints = task_constraints
+        self.solver_params = solver_params
+        self.max_parts = max_parts
+
+        self.num_workers = len(resources)
+        self.graph = DependencyGraph(tasks)
+
+        # makespan is the only objective sub plans compete for time on shared workers,
+        # so workers are split into pools; cost & resources keep the workers of the sub plans and only shift them in time
+        self.pool_workers = OptimizationMode(opt_mode[0]) == OptimizationMode.DURATION
+
+    def get_eligible_workers(self, t):
+        (*_, skill_required, _) = self.tasks[t]
+        if skill_required is None or skill_required == '':
+            return list(range(self.num_workers))
+
+        return [w for w in range(self.num_workers) if skill_required in self.resources[w][2]]
+
+    def get_num_parts(self, components):
+        num_parts = self.max_parts or os.cpu_count() or 1
+
+        if self.pool_workers:
+            # every part needs its own worker of each skill
+            for t in range(len(self.tasks)):
+                num_parts = min(num_parts, len(self.get_eligible_workers(t)))
+
+        return max(1, min(num_parts, len(components)))
+
+    def get_pools(self, parts):
+        # pools[part] -> workers; greedily to the part with the most work per worker of the worker's skills
+        if not self.pool_workers:
+            return [list(range(self.num_workers)) for _ in parts]
+
+        part_of = {t: p for p, part in enumerate(parts) for t in part}
+        demand = [{} for _ in parts]
+        for t in range(len(self.tasks)):
+            for w in self.get_eligible_workers(t):
+                demand[part_of[t]][w] = demand[part_of[t]].get(w, 0) + self.graph.durations[t]
+
+        pools = [[] for _ in parts]
+        for (t, w) in self.fixed_assignments:
+            if w not in pools[part_of[t]]:
+                pools[part_of[t]].append(w)
+
+        pooled = {w for pool in pools for w in pool}
+        for w in range(self.num_workers):
+            if w in pooled:
+                continue
+
+            # parts without such a worker first, then demand for the worker's skills per such worker
+            def score(p):
+                capacity = sum(1 for o in pools[p] if self.resources[o][2] == self.resources[w][2])
+                return (capacity == 0 and demand[p].get(w, 0) > 0, demand[p].get(w, 0) / (1 + capacity))
+
+            pools[max(range(len(parts)), key=score)].append(w)
+
+        return [sorted(pool) for pool in pools]
+
+    def get_part(self, part, pool):
+        # sub-problem on local indices of the part's tasks & the pool's workers
+        task_index = {t: i for i, t in enumerate(part)}
+        worker_index = {w: i for i, w in enumerate(pool)}
+
+        tasks = []
+        for t in part:
+            (name, effort_hrs, skill_required, depends_on_tasks) = self.tasks[t]
+            dependencies = [to_dependency(dep) for dep in depends_on_tasks]
+            tasks.append((name, effort_hrs, skill_required,
+                          [dep._replace(task=task_index[dep.task]) for dep in dependencies]))
+
+        kwargs = {
+            'opt_mode': self.opt_mode,
+            'fixed_assignments': [(task_index[t], worker_index[w]) for (t, w) in self.fixed_assignments
+                                  if t in task_index and w in worker_index],
+            'resource_constraints': [(worker_index[w], start, end) for (w, start, end) in self.resource_constraints
+                                     if w in worker_index],
+            'task_constraints': [(task_index[t], start, end) for (t, start, end) in self.task_constraints
+                                 if t in task_index]
+        }
+
+        return ([self.resources[w] for w in pool], tasks, kwargs)
+
+    def repair(self, task_assignments):
+        # workers of the sub plans are kept, tasks are shifted in the order of their starts:
+        # never later than in a sub plan, conflicts on shared workers are resolved
+        workers = [(t, w) for t, (_, _, w) in task_assignments.items()]
+        scheduler = ListScheduler(self.resources, self.tasks, workers, self.resource_constraints, self.task_constraints)
+        priority = [(-task_assignments[t][0], -t) for t in range(len(self.tasks))]
+
+        return scheduler.schedule(priority=priority)
+
+    def solve_master(self, task_assignments, solver_params):
+        # the whole model from the merged plan: shared workers & the team are re-optimized across the parts,
+        # the merged plan is kept if nothing better is found
+        model = self.model_cls(self.resources, self.tasks, opt_mode=self.opt_mode,
+                               fixed_assignments=self.fixed_assignments,
+                               resource_constraints=self.resource_constraints,
+                               task_constraints=self.task_constraints, solver_params=solver_params)
+        model.set_warm_start(task_assignments)
+        solution = model.solve()
+
+        return None if solution is None else solution['task_assignments']
+
+    def get_key(self, solution):
+        # objectives in priority order, compared lexicographically
+        return tuple(solution[OptimizationMode(m).value] for m in self.opt_mode)
+
+    def to_results(self, task_assignments):
+        solution = {
+            'objective_value': None,
+            'task_assignments': task_assignments,
+            'workers_assignments': to_workers_assignments(self.num_workers, task_assignments)
+        }
+        fill_totals(self.tasks, self.resources, solution)
+
+        solution['objective_value'] = solution[OptimizationMode(self.opt_mode[0]).value]
+        return solution
+
+    def solve(self):
+        components = self.graph.components()
+        workloads = self.graph.durations
+        parts = group_components(components, workloads, self.get_num_parts(components))
+        pools = self.get_pools(parts)
+
+        print(f'{len(components)} workstreams in {len(parts)} parts: '
+              + ', '.join(f'{len(part)} tasks x {len(pool)} workers' for part, pool in zip(parts, pools)))
+
+        # cores are split between parts, the master solve gets the rest of the time limit
+        start_time = time.time()
+        time_limit = self.solver_params.max_iteration_search_time
+        solver_params = copy.copy(self.solver_params)
+        solver_params.num_search_workers = max(1, (self.solver_params.num_search_workers or os.cpu_count() or 1) // len(parts))
+        if time_limit:
+            solver_params.max_iteration_search_time = time_limit * PARTS_TIME_SHARE
+
+        with ProcessPoolExecutor(max_workers=len(parts)) as executor:
+            futures = [executor.submit(solve_part, self.model_cls, *self.get_part(part, pool), solver_params)
+                       for part, pool in zip(parts, pools)]
+
+        task_assignments = {}
+        for part, pool, future in zip(parts, pools, futures):
+            part_assignments = future.result()
+            if part_assignments is None:
+                print("No solution found for a part.")
+                return None
+
+            for i, (start, end, w) in part_assignments.items():
+                task_assignments[part[i]] = (start, end, pool[w])
+
+        parts_days = makespan(task_assignments)
+        task_assignments = self.repair(task_assignments)
+        if task_assignments is None:
+            print("No solution found: merged plan violates task constraints.")
+            return None
+
+        solution = self.to_results(task_assignments)
+        print(f"Solution merged. Total objective func = {solution['objective_value']}\n")
+        if solution['duration'] > parts_days:
+            print(f"Repair on shared workers made the plan longer: {solution['duration']} days "
+                  f"instead of {parts_days} of the slowest part\n")
+
+        master_params = copy.copy(self.solver_params)
+        if time_limit:
+            master_params.max_iteration_search_time = max(1, time_limit - (time.time() - start_time))
+        master_assignments = self.solve_master(task_assignments, master_params)
+        if master_assignments is not None:
+            master = self.to_results(master_assignments)
+            if self.get_key(master) < self.get_key(solution):
+                solution = master
+
+        print(f"Solution re-solved as a whole. Total objective func = {solution['objective_value']}\n")
+
+        return solution
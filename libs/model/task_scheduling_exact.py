@@ -0,0 +1,159 @@
+from itertools import combinations
+
+from libs.model.list_scheduling import ListScheduler, WorkerRule, PriorityRule
+from libs.model.task_scheduling import fill_totals, to_workers_assignments
+from libs.model.task_scheduling_multiopt import OptimizationMode
+
+# minimum covers are searched by size, larger teams fall back to CP-SAT
+MAX_COVERS = 100000
+# covers of the minimum size tried to rank by the next objectives
+MAX_RANKED_COVERS = 100
+
+
+class TaskSchedulingExact:
+    """Closed-form optima when timing doesn't matter: min cost & min resources without deadlines, no CP-SAT."""
+
+    # Without deadlines any assignment of workers can be scheduled serially, so
+    # - min cost is the cheapest eligible worker of every task, fixed assignments aside,
+    # - min resources is the smallest team which has every required skill, the minimum set cover.
+
+    def __init__(self,
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 opt_mode: list,
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = []        # (task_id, start, end)
+                 ):
+        self.resources = resources
+        self.tasks = tasks
+        self.opt_mode = [OptimizationMode(m) for m in opt_mode]
+        self.fixed_assignments = fixed_assignments
+        self.resource_constraints = resource_constraints
+        self.task_constraints = task_constraints
+
+        self.num_workers = len(resources)
+        self.num_tasks = len(tasks)
+        self.scheduler = ListScheduler(resources, tasks, fixed_assignments, resource_constraints, task_constraints)
+
+    def has_deadlines(self):
+        return any(end is not None for (_, _, end) in self.task_constraints)
+
+    def get_cheapest_workers(self, t):
+        # cheapest of the eligible workers, all of them on a tie
+        workers = self.scheduler.get_eligible_workers(t)
+        if not workers:
+            return []
+
+        cost = min(self.resources[w][1] for w in workers)
+        return [w for w in workers if self.resources[w][1] == cost]
+
+    def get_min_covers(self):
+        # smallest teams which can do every task, fixed workers are always in; None if there are too many teams
+        fixed = sorted({w for (_, w) in self.fixed_assignments})
+        fixed_tasks = {t for (t, _) in self.fixed_assignments}
+        eligible = [set(self.scheduler.get_eligible_workers(t)) for t in range(self.num_tasks) if t not in fixed_tasks]
+        others = [w for w in range(self.num_workers) if w not in fixed]
+
+        num_tried = 0
+        for size in range(len(others) + 1):
+            covers = []
+            for team in combinations(others, size):
+                num_tried += 1
+                if num_tried > MAX_COVERS:
+                    return None
+
+                workers = set(fixed).union(team)
+                if all(workers & e for e in eligible):
+                    covers.append(sorted(workers))
+                    if len(covers) >= MAX_RANKED_COVERS:
+                        return covers
+
+            if covers:
+                return covers
+
+        return []
+
+    def to_results(self, task_assignments):
+        solution = {
+            'objective_value': None,
+            'task_assignments': task_assignments,
+            'workers_assignments': to_workers_assignments(self.num_workers, task_assignments)
+        }
+        fill_totals(self.tasks, self.resources, solution)
+
+        solution['objective_value'] = solution[self.opt_mode[0].value]
+        return solution
+
+    def rank(self, solution):
+        return tuple(solution[opt.value] for opt in self.opt_mode)
+
+    def solve_cost(self):
+        # cheapest worker per task, the earliest to finish on a tie
+        task_assignments = self.scheduler.schedule(WorkerRule.CHEAPEST, PriorityRule.LONGEST_PATH)
+        return None if task_assignments is None else self.to_results(task_assignments)
+
+    def solve_resources(self):
+        # teams of the minimum size scheduled greedily, the best one by the next objectives
+        covers = self.get_min_covers()
+        if not covers:
+            return None
+
+        best = None
+        for team in covers:
+            # the team only, workers are renumbered
+            index = {w: i for i, w in enumerate(team)}
+            scheduler = ListScheduler([self.resources[w] for w in team], self.tasks,
+                                      [(t, index[w]) for (t, w) in self.fixed_assignments],
+                                      [(index[w], start, end) for (w, start, end) in self.resource_constraints
+                                       if w in index],
+                                      self.task_constraints)
+
+            for worker_rule in WorkerRule:
+                task_assignments = scheduler.schedule(worker_rule, PriorityRule.LONGEST_PATH)
+                if task_assignments is None:
+                    continue
+
+                task_assignments = {t: (start, end, team[w]) for t, (start, end, w) in task_assignments.items()}
+                solution = self.to_results(task_assignments)
+                if best is None or self.rank(solution) < self.rank(best):
+                    best = solution
+
+        return best
+
+    def solve(self):
+        # exact plan if the objectives allow one, None to solve with CP-SAT
+        if self.has_deadlines() or self.scheduler.order is None:
+            return None
+
+        # only the first objective is exact, the next ones are ranked greedily, so they have to be fixed by it
+        match self.opt_mode:
+            case [OptimizationMode.COST]:
+                solution = self.solve_cost()
+            case [OptimizationMode.RESOURCES]:
+                solution = self.solve_resources()
+            case _:
+                return None
+
+        if solution is not None:
+            print(f"Exact solution found without CP-SAT. Total objective func = {solution['objective_value']}\n")
+
+        return solution
+
+    def get_fixed_assignments(self):
+        # for cost first: tasks with a single cheapest worker get it, None if there are deadlines or ties;
+        # the next objectives are solved among the cheapest plans only
+        if self.has_deadlines() or self.scheduler.order is None or self.opt_mode[0] != OptimizationMode.COST:
+            return None
+
+        fixed = dict(self.fixed_assignments)
+        for t in range(self.num_tasks):
+            if t in fixed:
+                continue
+
+            cheapest = self.get_cheapest_workers(t)
+            if len(cheapest) != 1:
+                return None
+            fixed[t] = cheapest[0]
+
+        return sorted(fixed.items())
@@ -0,0 +1,62 @@
+from itertools import product
+
+from libs.model.list_scheduling import ListScheduler, PriorityRule, WorkerRule
+from libs.model.task_scheduling import fill_totals, to_workers_assignments
+from libs.model.task_scheduling_multiopt import OptimizationMode
+
+
+class TaskSchedulingHeuristic:
+    """Draft plans in milliseconds: list scheduling with a portfolio of priority & worker rules, no CP-SAT."""
+
+    def __init__(self,
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 opt_mode: list = [OptimizationMode.DURATION],  # how to rank the drafts
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = [],       # (task_id, start, end)
+                 priority_rules: list = list(PriorityRule),
+                 worker_rules: list = list(WorkerRule)
+                 ):
+        self.resources = resources
+        self.tasks = tasks
+        self.opt_mode = opt_mode or [OptimizationMode.DURATION]
+        self.priority_rules = priority_rules
+        self.worker_rules = worker_rules
+
+        self.num_workers = len(resources)
+        self.scheduler = ListScheduler(resources, tasks, fixed_assignments, resource_constraints, task_constraints)
+
+    def to_results(self, task_assignments, priority_rule, worker_rule):
+        solution = {
+            'objective_value': None,
+            'rules': (priority_rule.value, worker_rule.value),
+            'task_assignments': task_assignments,
+            'workers_assignments': to_workers_assignments(self.num_workers, task_assignments)
+        }
+        fill_totals(self.tasks, self.resources, solution)
+
+        solution['objective_value'] = solution[OptimizationMode(self.opt_mode[0]).value]
+        return solution
+
+    def rank(self, solution):
+        return tuple(solution[OptimizationMode(opt).value] for opt in self.opt_mode)
+
+    def solve(self):
+        best = None
+
+        for (priority_rule, worker_rule) in product(self.priority_rules, self.worker_rules):
+            task_assignments = self.scheduler.schedule(worker_rule, priority_rule)
+            if task_assignments is None:
+                continue
+
+            solution = self.to_results(task_assignments, priority_rule, worker_rule)
+            if best is None or self.rank(solution) < self.rank(best):
+                best = solution
+
+        if best is None:
+            print("No draft solution found.")
+        else:
+            print(f"Draft solution found by {best['rules']} rules. Total objective func = {best['objective_value']}\n")
+
+        return best
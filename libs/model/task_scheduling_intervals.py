@@ -0,0 +1,156 @@
+from enum import Enum
+from collections import defaultdict
+
+from ortools.sat.python import cp_model
+
+from libs.model.task_scheduling import TaskSchedulingBase, MinCostModel, MinResourcesModel, MinDurationModel, \
+    max_duration
+from libs.model.task_scheduling_lexicographic import TaskSchedulingLexicographic
+from libs.model.task_scheduling_multiopt import TaskSchedulingMultiOpt
+from libs.model.task_scheduling_multiopt_weights import TaskSchedulingMultiOptWeights
+from libs.model.task_scheduling_pareto import TaskSchedulingPareto
+
+
+class ModelEngine(str, Enum):
+    DAYS = 'days'               # task x day x worker booleans, see TaskSchedulingBase.build_model
+    INTERVALS = 'intervals'     # optional intervals per (task, worker), see TaskSchedulingIntervals.build_model
+
+
+class TaskSchedulingIntervals(TaskSchedulingBase):
+    """Optional intervals per (task, worker) instead of task x day x worker booleans."""
+
+    # Same `task_intervals` and `task_workers` variables as the days engine,
+    # so objectives of MinCostModel, MinResourcesModel and MinDurationModel are reused as is.
+
+    def __init__(self, *args, **kwargs):
+        TaskSchedulingBase.__init__(self, *args, **kwargs)
+
+        # Variable space
+        self.task_worker_intervals = None   # task_worker_intervals[t, w] -> optional IntervalVar, eligible pairs only
+
+    def build_model(self):
+        self.setup_horizon()
+
+        model = cp_model.CpModel()
+        # Variables space:
+        self.task_intervals = {}
+        self.task_starts = {}
+        self.task_workers = {}
+        self.task_worker_intervals = {}
+        self.task_day_workers = None
+        task_durations = {}
+        # worker_intervals [w] -> intervals which can't overlap for a worker
+        worker_intervals = defaultdict(list)
+
+        # earliest start & latest finish of every task by the critical path method
+        windows = self.horizon.get_windows(self.num_days)
+
+        # 1. Construct variable space, task should be finished within its window
+        for t in range(self.num_tasks):
+            t_duration = max_duration([self.tasks[t]])
+
+            start = self.add_start(model, t, windows[t])
+            interval = model.NewFixedSizedIntervalVar(start, t_duration, f'interval_task{t}')
+
+            self.task_intervals[t] = interval
+            self.task_starts[t] = start
+            task_durations[t] = t_duration
+
+        # 2. Add dependencies on intervals, links implied by longer paths are left out
+        for (dep, t, offset) in self.graph.reduced_precedences():
+            interval = self.task_intervals[t]  # this interval
+            dependency = self.task_intervals[dep]
+
+            model.Add(interval.StartExpr() >= dependency.StartExpr() + offset)
+
+        # 3. Worker alternatives + skills matching:
+        #    optional interval per skill-eligible worker, ineligible pairs are constant 0
+        for t in range(self.num_tasks):
+            for w in range(self.num_workers):
+                if not self.is_eligible(t, w):
+                    self.task_workers[t, w] = model.NewConstant(0)
+                    continue
+
+                works = model.NewBoolVar(f'task{t}_worker{w}')
+                worker_interval = model.NewOptionalFixedSizedIntervalVar(
+                    self.task_starts[t], task_durations[t], works, f'interval_task{t}_worker{w}')
+
+                self.task_workers[t, w] = works
+                self.task_worker_intervals[t, w] = worker_interval
+                worker_intervals[w].append(worker_interval)
+
+            # 3.1 only 1 worker should work on the task
+            works = [self.task_workers[t, w] for w in range(self.num_workers) if (t, w) in self.task_worker_intervals]
+            model.AddExactlyOne(works)
+
+        # 4. Fixed assignments should be met
+        for (t, w_preferred) in self.fixed_assignments:
+            model.Add(self.task_workers[t, w_preferred] == 1)
+
+        # 5. Resource constraints - can't work on specific date, e.g. on vacation
+        for (resource_id, start, end) in self.resource_constraints:
+            unavailable = model.NewIntervalVar(start, end + 1 - start, end + 1, f'unavailable_worker{resource_id}_{start}_{end}')
+            worker_intervals[resource_id].append(unavailable)
+
+        # 6. Worker can work on a single task at a time
+        for w in range(self.num_workers):
+            model.AddNoOverlap(worker_intervals[w])
+
+        # 7. Task constraints - should be done within a specific date ranges
+        for (task_id, start, end) in self.task_constraints:
+            if start is not None:
+                model.Add(self.task_starts[task_id] >= start)
+            if end is not None:
+                model.Add((self.task_starts[task_id] + task_durations[task_id]) <= end)
+
+        # 8. Interchangeable workers are used in order
+        self.add_symmetry_breaking(model)
+
+        # 9. Redundant capacity of skill pools
+        if self.get_solver_params().redundant_constraints:
+            self.add_redundant_constraints(model)
+
+        self.index_variables()
+        self.add_warm_start(model)
+
+        return model
+
+
+class MinCostIntervalsModel(TaskSchedulingIntervals, MinCostModel):
+    pass
+
+
+class MinResourcesIntervalsModel(TaskSchedulingIntervals, MinResourcesModel):
+    pass
+
+
+class MinDurationIntervalsModel(TaskSchedulingIntervals, MinDurationModel):
+    pass
+
+
+class TaskSchedulingMultiOptIntervals(TaskSchedulingIntervals, TaskSchedulingMultiOpt):
+    def __init__(self, *args, **kwargs):
+        TaskSchedulingMultiOpt.__init__(self, *args, **kwargs)
+
+        self.task_worker_intervals = None
+
+
+class TaskSchedulingMultiOptWeightsIntervals(TaskSchedulingIntervals, TaskSchedulingMultiOptWeights):
+    def __init__(self, *args, **kwargs):
+        TaskSchedulingMultiOptWeights.__init__(self, *args, **kwargs)
+
+        self.task_worker_intervals = None
+
+
+class TaskSchedulingLexicographicIntervals(TaskSchedulingIntervals, TaskSchedulingLexicographic):
+    def __init__(self, *args, **kwargs):
+        TaskSchedulingLexicographic.__init__(self, *args, **kwargs)
+
+        self.task_worker_intervals = None
+
+
+class TaskSchedulingParetoIntervals(TaskSchedulingIntervals, TaskSchedulingPareto):
+    def __init__(self, *args, **kwargs):
+        TaskSchedulingPareto.__init__(self, *args, **kwargs)
+
+        self.task_worker_intervals = None
@@ -0,0 +1,93 @@
+import time
+
+from ortools.sat.python import cp_model
+
+from libs.model.task_scheduling_multiopt import TaskSchedulingMultiOpt, OptimizationMode
+from libs.model.telemetry import telemetry
+
+
+class TaskSchedulingLexicographic(TaskSchedulingMultiOpt):
+    """Lexicographic optimization over a single CpModel: built once, stages only add a bound and swap the objective."""
+
+    def solve(self):
+        self.stats = []
+
+        name = type(self).__name__
+        build_start = time.time()
+        with telemetry.phase('build_model', model=name):
+            model = self.build_model()
+        with telemetry.phase('preprocess_model', model=name):
+            self.preprocess_model(model)
+        with telemetry.phase('get_objective', model=name):
+            objectives = [self.get_cls(opt).get_objective(self, model) for opt in self.opt_mode]
+        build_time = time.time() - build_start
+
+        solver = None
+        for stage, opt in enumerate(self.opt_mode):
+            self.stage = stage
+            if stage > 0:
+                build_start = time.time()
+                # keep previous objective at its best found value
+                model.Add(objectives[stage - 1] <= round(solver.objective_value))
+                self.hint_solution(model, solver)
+                build_time = time.time() - build_start
+
+            model.Minimize(objectives[stage])
+
+            # the hint completed into a plan: the warm start, the previous stage's plan of the next stages
+            max_time = self.get_max_time(stage, len(self.opt_mode))
+            hint_start = time.time()
+            hint_solver = self.solve_hint(model, max_time)
+            if max_time:
+                max_time = max(max_time - (time.time() - hint_start), 1)
+
+            stage_solver = cp_model.CpSolver()
+            self.setup_solver_params(stage_solver, max_time=max_time)
+            solution_printer = self.get_printer()
+
+            print(f"Solving stage {stage + 1}/{len(self.opt_mode)} ({OptimizationMode(opt).value}) started...")
+            if hint_solver is not None:
+                solution_printer.add_incumbent(hint_solver.objective_value, hint_solver.best_objective_bound)
+            solve_start = time.time()
+            with telemetry.phase('solve', model=name, stage=OptimizationMode(opt).value):
+                status = stage_solver.Solve(model, solution_printer)
+            solution_printer.finish()
+            solve_time = time.time() - solve_start
+            telemetry.add_solve(f'{name} {OptimizationMode(opt).value}', model, stage_solver, solution_printer)
+
+            if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE and hint_solver is not None:
+                print('No better solution found, the hint is kept')
+                (stage_solver, status) = (hint_solver, cp_model.FEASIBLE)
+
+            self.stats.append({
+                'mode': OptimizationMode(opt).value,
+                'status': stage_solver.StatusName(status),
+                'objective_value': stage_solver.objective_value,
+                'build_time': build_time,
+                'solve_time': solve_time,
+                'stop_reason': solution_printer.stop_reason,
+                'incumbents': solution_printer.incumbents
+            })
+
+            if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+                print("No solution found.")
+                break
+
+            print(f'Solution found. Total objective func = {stage_solver.objective_value}\n')
+            solver = stage_solver
+
+        self.print_stats()
+
+        if solver is None:
+            return None
+
+        with telemetry.phase('to_results', model=name):
+            solution = self.to_results(solver)
+        solution['stages'] = self.stats
+        return solution
+
+    def print_stats(self):
+        print('Stage            Status       Objective     Build, s   Solve, s')
+        for s in self.stats:
+            print('{:<16} {:<12} {:>12.0f} {:>10.2f} {:>10.2f}'.format(
+                s['mode'], s['status'], s['objective_value'], s['build_time'], s['solve_time']))
@@ -0,0 +1,285 @@
+import contextlib
+import copy
+import io
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+
+from libs.model.dependency_graph import DependencyGraph
+from libs.model.list_scheduling import makespan
+from libs.model.solver_params import SolverParams
+from libs.model.task_scheduling import fill_totals, to_workers_assignments
+from libs.model.task_scheduling_multiopt import OptimizationMode
+
+
+class Neighbourhood(str, Enum):
+    TIME_WINDOW = 'window'      # tasks starting in a window of days
+    WORKER = 'worker'           # tasks of a single worker
+    CHAIN = 'chain'             # tasks of a dependency chain
+    CRITICAL = 'critical'       # tasks the end of the plan waits for
+
+
+def solve_neighbourhood(model_cls, resources, tasks, kwargs, solver_params, incumbent):
+    # runs in a pool process, task_assignments of the re-solved plan or None; sub solves are quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = model_cls(resources, tasks, solver_params=solver_params, **kwargs)
+        if incumbent is not None:
+            model.set_warm_start(incumbent)
+            model.set_max_days(makespan(incumbent))
+        solution = model.solve()
+
+    return None if solution is None else solution['task_assignments']
+
+
+class TaskSchedulingLNS:
+    """Large neighbourhood search: most of the incumbent is fixed, a neighbourhood of tasks is re-solved."""
+
+    def __init__(self,
+                 model_cls,                         # TaskSchedulingMultiOpt-like model to re-solve neighbourhoods with
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 opt_mode: list,
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = [],       # (task_id, start, end)
+                 solver_params: SolverParams = SolverParams.default(),
+                 neighbourhood_time: float = 10,    # seconds per neighbourhood solve
+                 neighbourhood_size: float = 0.2,   # share of tasks freed, grows while there is no improvement
+                 max_parallel: int = 0,             # neighbourhoods solved at once, by default one per core
+                 seed: int = 0
+                 ):
+        if OptimizationMode.DEVIATION in [OptimizationMode(m) for m in opt_mode]:
+            raise ValueError("LNS doesn't support deviation from a baseline plan")
+
+        self.model_cls = model_cls
+        self.resources = resources
+        self.tasks = tasks
+        self.opt_mode = opt_mode
+        self.fixed_assignments = fixed_assignments
+        self.resource_constraints = resource_constraints
+        self.task_constraints = task_constraints
+        self.solver_params = solver_params
+        self.neighbourhood_time = neighbourhood_time
+        self.neighbourhood_size = neighbourhood_size
+        self.max_parallel = max_parallel
+
+        self.num_workers = len(resources)
+        self.num_tasks = len(tasks)
+        self.graph = DependencyGraph(tasks)
+        self.random = random.Random(seed)
+
+        # task_assignments[t] -> (start, end, worker) to start from, e.g. a heuristic plan
+        self.warm_start = None
+        # curve[i] -> (seconds, objective_value) of every improvement
+        self.curve = []
+
+    def set_warm_start(self, task_assignments):
+        self.warm_start = task_assignments
+
+    def get_key(self, solution):
+        # objectives in priority order, compared lexicographically
+        return tuple(solution[OptimizationMode(m).value] for m in self.opt_mode)
+
+    def get_size(self, scale):
+        return max(2, min(self.num_tasks, round(self.num_tasks * self.neighbourhood_size * scale)))
+
+    def get_window(self, incumbent, size):
+        # size tasks in order of their starts from a random one
+        by_start = sorted(range(self.num_tasks), key=lambda t: incumbent[t][0])
+        first = self.random.randrange(max(1, self.num_tasks - size + 1))
+
+        return by_start[first:first + size]
+
+    def get_worker_tasks(self, incumbent, size):
+        # tasks of a random busy worker, a window of them if there are too many
+        workers = sorted({w for (_, _, w) in incumbent.values()})
+        w = self.random.choice(workers)
+        worker_tasks = sorted((t for t, (_, _, t_w) in incumbent.items() if t_w == w), key=lambda t: incumbent[t][0])
+        first = self.random.randrange(max(1, len(worker_tasks) - size + 1))
+
+        return worker_tasks[first:first + size]
+
+    def get_chain(self, incumbent, size):
+        # a random task with the predecessors it waits for and the successors waiting for it
+        t = self.random.randrange(self.num_tasks)
+        chain = [t]
+
+        (first, last) = (t, t)
+        while len(chain) < size:
+            # the binding links: predecessor finishing last, successor starting first
+            preds = [p for p in self.graph.predecessors[first] if p not in chain]
+            succs = [s for s in self.graph.successors[last] if s not in chain]
+            if not preds and not succs:
+                break
+
+            if preds:
+                first = max(preds, key=lambda p: incumbent[p][1])
+                chain.append(first)
+            if succs and len(chain) < size:
+                last = min(succs, key=lambda s: incumbent[s][0])
+                chain.append(last)
+
+        return chain
+
+    def get_critical(self, incumbent, size):
+        # from the last task to finish back along the links & worker sequences which are tight in the incumbent,
+        # the whole of it even if it's larger than size, only then the plan can get shorter
+        previous = {}
+        for w in {t_w for (_, _, t_w) in incumbent.values()}:
+            worker_tasks = sorted((t for t, (_, _, t_w) in incumbent.items() if t_w == w), key=lambda t: incumbent[t][0])
+            previous.update(zip(worker_tasks[1:], worker_tasks))
+
+        last = max(range(self.num_tasks), key=lambda t: incumbent[t][1])
+        critical = {last}
+        stack = [last]
+        while stack:
+            t = stack.pop()
+            start = incumbent[t][0]
+            tight = [p for p, offset in self.graph.predecessors[t].items() if incumbent[p][0] + offset == start]
+            if t in previous and incumbent[previous[t]][1] == start:
+                tight.append(previous[t])
+
+            for p in tight:
+                if p not in critical:
+                    critical.add(p)
+                    stack.append(p)
+
+        # filled up with the tasks starting next to it
+        by_start = sorted((t for t in range(self.num_tasks) if t not in critical),
+                          key=lambda t: min(abs(incumbent[t][0] - incumbent[c][0]) for c in critical))
+        return list(critical) + by_start[:max(0, size - len(critical))]
+
+    def get_neighbourhood(self, incumbent, neighbourhood: Neighbourhood, size):
+        match neighbourhood:
+            case Neighbourhood.WORKER: return self.get_worker_tasks(incumbent, size)
+            case Neighbourhood.CHAIN: return self.get_chain(incumbent, size)
+            case Neighbourhood.CRITICAL: return self.get_critical(incumbent, size)
+
+        return self.get_window(incumbent, size)
+
+    def get_tasks(self, incumbent, free):
+        # tasks out of the neighbourhood keep their order per worker, a finish to start link from the previous one,
+        # so they shift with the neighbourhood; pinned to their dates if the links close a cycle of negative lags
+        free = set(free)
+        fixed = sorted((t for t in range(self.num_tasks) if t not in free and self.graph.durations[t] > 0),
+                       key=lambda t: (incumbent[t][0], t))
+
+        sequence = {}
+        previous = {}
+        for t in fixed:
+            w = incumbent[t][2]
+            if w in previous:
+                sequence[t] = previous[w]
+            previous[w] = t
+
+        tasks = [(name, effort_hrs, skill_required, list(depends_on_tasks) + ([sequence[t]] if t in sequence else []))
+                 for t, (name, effort_hrs, skill_required, depends_on_tasks) in enumerate(self.tasks)]
+        if DependencyGraph(tasks).order is None:
+            return None
+
+        return tasks
+
+    def get_kwargs(self, incumbent, free, pinned):
+        # tasks out of the neighbourhood keep their workers, their dates too if they are pinned
+        free = set(free)
+        fixed = [t for t in range(self.num_tasks) if t not in free]
+        task_constraints = [(t, incumbent[t][0], incumbent[t][1]) for t in fixed] if pinned else []
+
+        return {
+            'opt_mode': self.opt_mode,
+            'fixed_assignments': self.fixed_assignments + [(t, incumbent[t][2]) for t in fixed],
+            'resource_constraints': self.resource_constraints,
+            'task_constraints': self.task_constraints + task_constraints
+        }
+
+    def to_results(self, task_assignments):
+        solution = {
+            'objective_value': None,
+            'task_assignments': task_assignments,
+            'workers_assignments': to_workers_assignments(self.num_workers, task_assignments)
+        }
+        fill_totals(self.tasks, self.resources, solution)
+
+        solution['objective_value'] = solution[OptimizationMode(self.opt_mode[0]).value]
+        return solution
+
+    def get_initial(self, executor, solver_params):
+        # warm start if there is one, otherwise a short solve of the whole model
+        if self.warm_start:
+            return self.warm_start
+
+        kwargs = {
+            'opt_mode': self.opt_mode,
+            'fixed_assignments': self.fixed_assignments,
+            'resource_constraints': self.resource_constraints,
+            'task_constraints': self.task_constraints
+        }
+        future = executor.submit(solve_neighbourhood, self.model_cls, self.resources, self.tasks, kwargs,
+                                 solver_params, None)
+        return future.result()
+
+    def solve(self):
+        num_parallel = self.max_parallel or os.cpu_count() or 1
+        time_limit = self.solver_params.max_iteration_search_time
+
+        # cores are split between neighbourhoods, the objectives' stages share the neighbourhood time
+        solver_params = copy.copy(self.solver_params)
+        solver_params.max_iteration_search_time = self.neighbourhood_time
+        solver_params.stage_time_split = self.solver_params.stage_time_split or [1]
+        solver_params.num_search_workers = max(1, (self.solver_params.num_search_workers or os.cpu_count() or 1)
+                                               // num_parallel)
+
+        start_time = time.time()
+        self.curve = []
+        neighbourhoods = list(Neighbourhood)
+
+        with ProcessPoolExecutor(max_workers=num_parallel) as executor:
+            incumbent = self.get_initial(executor, solver_params)
+            if incumbent is None:
+                print("No solution found.")
+                return None
+
+            solution = self.to_results(incumbent)
+            self.curve.append((time.time() - start_time, solution['objective_value']))
+            print('LNS start, time = %0.2f s, objective = %i' % self.curve[-1])
+
+            scale = 1
+            num_rounds = 0
+            while time.time() - start_time + self.neighbourhood_time <= time_limit:
+                num_rounds += 1
+                size = self.get_size(scale)
+
+                # every process gets its own neighbourhood of the same incumbent
+                futures = []
+                for i in range(num_parallel):
+                    neighbourhood = neighbourhoods[(num_rounds + i) % len(neighbourhoods)]
+                    free = self.get_neighbourhood(incumbent, neighbourhood, size)
+                    tasks = self.get_tasks(incumbent, free)
+                    kwargs = self.get_kwargs(incumbent, free, pinned=tasks is None)
+                    futures.append(executor.submit(solve_neighbourhood, self.model_cls, self.resources,
+                                                   tasks or self.tasks, kwargs, solver_params, incumbent))
+
+                results = [f.result() for f in futures]
+                candidates = [self.to_results(r) for r in results if r is not None]
+                best = min(candidates, key=self.get_key, default=None)
+
+                if best is not None and self.get_key(best) < self.get_key(solution):
+                    incumbent = best['task_assignments']
+                    solution = best
+                    scale = 1
+
+                    self.curve.append((time.time() - start_time, solution['objective_value']))
+                    print('LNS round %i, time = %0.2f s, objective = %i' % (num_rounds, *self.curve[-1]))
+                else:
+                    # equal plans are accepted to move on plateaus, the neighbourhood grows to escape them
+                    if best is not None and self.get_key(best) == self.get_key(solution):
+                        incumbent = best['task_assignments']
+                        solution = best
+                    scale = min(scale * 1.25, 1 / self.neighbourhood_size)
+
+        print(f"LNS finished after {num_rounds} rounds. Total objective func = {solution['objective_value']}\n")
+
+        solution['curve'] = self.curve
+        return solution
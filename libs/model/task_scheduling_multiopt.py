@@ -7,13 +7,14 @@ from ortools.sat.python.cp_model import IntVar, CpModel
 
 from libs.model.solver_params import SolverParams
 from libs.model.task_scheduling import TaskSchedulingBase, MinCostModel, MinResourcesModel, MinDurationModel, \
-    max_duration
+    MinDeviationModel, max_duration
 
 
 class OptimizationMode(str, Enum):
     DURATION = 'duration'
     COST = 'cost'
     RESOURCES = 'resources'
+    DEVIATION = 'deviation'     # changes to a baseline plan, see MinDeviationModel
 
 
 class TaskSchedulingMultiOpt(MinCostModel, MinResourcesModel, MinDurationModel):
@@ -49,6 +50,7 @@ class TaskSchedulingMultiOpt(MinCostModel, MinResourcesModel, MinDurationModel):
 
         self.opt_mode = opt_mode
         self.current_solver = None
+        self.stage = 0
         self.__hints = {}
         self.__accumulated_objs = []
 
@@ -68,37 +70,33 @@ class TaskSchedulingMultiOpt(MinCostModel, MinResourcesModel, MinDurationModel):
 
     def preprocess_model(self, model: CpModel):
         if not self.__hints:
-            pass
-
-        # hints = {
-        #     'task_intervals': {},
-        #     'task_workers': {},
-        #     'task_day_workers': {}
-        # }
-
-        if 'task_intervals' in self.__hints:
-            for t in range(self.num_tasks):
-                (start, end, duration) = self.__hints['task_intervals'][t]
-                model.AddHint(self.task_intervals[t].StartExpr(), start)
-
-        if 'task_workers' in self.__hints:
-            for t in range(self.num_tasks):
-                for w in range(self.num_workers):
-                    works = self.__hints['task_workers'][t, w]
-                    model.AddHint(self.task_workers[t, w], works)
-
-        if 'task_day_workers' in self.__hints:
-            for w in range(self.num_workers):
-                for d in range(self.num_days):
-                    for t in range(self.num_tasks):
-                        works = self.__hints['task_day_workers'][t, d, w]
-                        model.AddHint(self.task_day_workers[t, d, w], works)
+            return
+
+        # previous stage solution replaces the warm start
+        model.ClearHints()
+        self.add_hints(model, self.__hints)
+
+    def get_num_days(self):
+        # horizon of the first objective holds for the next ones, as they are pinned to its optimum;
+        # except resources after cost, min resources among the cheapest plans may need a longer one
+        first, *rest = self.opt_mode
+        if first == OptimizationMode.COST and OptimizationMode.RESOURCES in rest:
+            return TaskSchedulingBase.get_num_days(self)
+
+        return self.get_cls(first).get_num_days(self)
+
+    def get_stage(self):
+        return (self.stage, len(self.opt_mode))
+
+    def get_stage_name(self):
+        return OptimizationMode(self.opt_mode[self.stage]).value
 
     def get_cls(self, opt_mode: OptimizationMode):
         match opt_mode:
             case OptimizationMode.DURATION: return MinDurationModel
             case OptimizationMode.COST: return MinCostModel
             case OptimizationMode.RESOURCES: return MinResourcesModel
+            case OptimizationMode.DEVIATION: return MinDeviationModel
 
     def solve(self):
 
@@ -106,11 +104,15 @@ class TaskSchedulingMultiOpt(MinCostModel, MinResourcesModel, MinDurationModel):
         self.__accumulated_objs = []
 
         # optimizations to use:
-        for opt in self.opt_mode:
+        for stage, opt in enumerate(self.opt_mode):
             # print(opt)
+            self.stage = stage
             self.current_solver = self.get_cls(opt)
             # call parent class optimization
             solution = self.current_solver.solve(self)
+            if solution is None:
+                return None
+
             self.__hints = solution['__hints']
             self.__accumulated_objs.append((opt, solution['objective_value']))
 
@@ -1,14 +1,37 @@
+import copy
+import multiprocessing
+import os
 from enum import Enum
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 from ortools.sat.python import cp_model
 from ortools.sat.python.cp_model import IntVar, CpModel
 
+from libs.model.early_stop_callback import STOP_POLL_TIME
 from libs.model.solver_params import SolverParams
 from libs.model.task_scheduling import TaskSchedulingBase, MinCostModel, MinResourcesModel, MinDurationModel, \
-    max_duration
+    MinDeviationModel, max_duration
 from libs.model.task_scheduling_multiopt import OptimizationMode
+from libs.model.telemetry import telemetry
+
+
+def solve_anchor(model, opt, num_search_workers, stop_event, telemetry_start):
+    # runs in a pool process on a copy of the model, stopped with the other anchors;
+    # (solution, solves recorded by the telemetry of the process)
+    if telemetry_start is not None:
+        telemetry.enable(telemetry_start)
+
+    solver_params = copy.copy(model.get_solver_params())
+    solver_params.num_search_workers = num_search_workers
+    model.set_solver_params(solver_params)
+    model.stop_event = stop_event
+
+    model.anchor = opt
+    model.current_solver = model.get_cls(opt)
+    solution = model.current_solver.solve(model)
+    return (solution, telemetry.solves)
 
 
 class TaskSchedulingMultiOptWeights(MinCostModel, MinResourcesModel, MinDurationModel):
@@ -27,42 +50,12 @@ class TaskSchedulingMultiOptWeights(MinCostModel, MinResourcesModel, MinDuration
 
         TaskSchedulingBase.__init__(self, resources, tasks, fixed_assignments, resource_constraints, task_constraints, solver_params)
 
-        # self.task_day_workers = None  # task_day_workers[t, d, w] -> tasks x days x workers
-        # self.task_workers = None  # task_workers[t, w] -> tasks x workers
-        #
-        # self.resources = resources
-        # self.tasks = tasks
-        # self.fixed_assignments = fixed_assignments
-        #
-        # self.num_workers = len(resources)
-        # self.num_tasks = len(tasks)
-        #
-        # self.num_days = max_duration(tasks)
-
         if not opt_weights:
             raise ValueError("opt_weights should contain at least 1 OptimizationMode")
 
         self.opt_weights = opt_weights
         self.current_solver = None
-
-    # weighted sum
-    # def get_objective(self, model):
-    #     objs = []
-    #
-    #     # if some optimizations were done previously,
-    #     # -> lets try to target them
-    #     for opt in self.opt_weights:
-    #         weight = self.opt_weights[opt]
-    #         cls = self.get_cls(opt)
-    #         obj_fn = cls.get_objective(self, model)
-    #
-    #         objs.append((obj_fn, weight))
-    #
-    #     # weighted sum
-    #     weighted_obj = sum([o*w for (o,w) in objs])
-    #
-    #     return weighted_obj
-
+        self.anchor = None
 
     def get_objective(self, model):
 
@@ -99,12 +92,22 @@ class TaskSchedulingMultiOptWeights(MinCostModel, MinResourcesModel, MinDuration
             'cost': 0
         }
 
+        # anchors - optimum of every objective alone, independent solves run in parallel
+        anchor_workers = self.get_anchor_search_workers()
+        telemetry_start = telemetry.start_time if telemetry.enabled else None
+        with multiprocessing.Manager() as manager:
+            anchors_stop = manager.Event()
+            with ProcessPoolExecutor(max_workers=len(self.opt_weights)) as executor:
+                futures = {executor.submit(solve_anchor, self, opt, anchor_workers[opt], anchors_stop, telemetry_start):
+                           opt for opt in self.opt_weights}
+                anchors = self.wait_anchors(futures, anchors_stop)
+
+        if anchors is None:
+            return None
+
         # optimizations to use:
         for opt in self.opt_weights:
-            # print(opt)
-            self.current_solver = self.get_cls(opt)
-            # call parent class optimization
-            solution = self.current_solver.solve(self)
+            solution = anchors[opt]
 
             # objective values
             self.__targets[opt] = solution['objective_value']
@@ -119,11 +122,59 @@ class TaskSchedulingMultiOptWeights(MinCostModel, MinResourcesModel, MinDuration
                 self.__maxes['resources'] = solution['resources']
 
         self.current_solver = None
-        return TaskSchedulingBase.solve(self)
+        solution = TaskSchedulingBase.solve(self)
+        if solution is None and self.stop_event is not None and self.stop_event.is_set():
+            # stopped before a weighted plan, the anchor of the largest weight is the best plan so far
+            opt = max(self.opt_weights, key=self.opt_weights.get)
+            print(f'Stopped before a weighted plan, the {OptimizationMode(opt).value} anchor plan is kept')
+            return anchors[opt]
+
+        return solution
+
+    def wait_anchors(self, futures, anchors_stop):
+        # solutions[opt] of every anchor, None as soon as one has none; the other anchors are stopped then,
+        # all of them on a stop request
+        solutions = {}
+        pending = set(futures)
+        while pending:
+            (done, pending) = wait(pending, timeout=STOP_POLL_TIME, return_when=FIRST_COMPLETED)
+            if self.stop_event is not None and self.stop_event.is_set():
+                anchors_stop.set()
+
+            for future in done:
+                opt = futures[future]
+                (solutions[opt], solves) = future.result()
+                telemetry.add_solves(solves, f'{OptimizationMode(opt).value} anchor:')
+                if solutions[opt] is None:
+                    print(f'No solution found for the {OptimizationMode(opt).value} anchor, the other anchors are stopped')
+                    anchors_stop.set()
+                    return None
+
+        return solutions
+
+    def get_anchor_search_workers(self):
+        # OptimizationMode -> num_search_workers, cores are split evenly if not configured
+        solver_params = self.get_solver_params()
+        if solver_params.anchor_search_workers:
+            return {opt: solver_params.anchor_search_workers.get(opt, 1) for opt in self.opt_weights}
+
+        num_cores = solver_params.num_search_workers or os.cpu_count() or 1
+        return {opt: max(1, num_cores // len(self.opt_weights)) for opt in self.opt_weights}
+
+    def get_stage_name(self):
+        return f'{OptimizationMode(self.anchor).value} anchor' if self.anchor is not None else 'weighted'
+
+    def get_num_days(self):
+        # weighted optimum may be anywhere, only single objective solves can use a tight horizon
+        if self.current_solver is not None:
+            return self.current_solver.get_num_days(self)
+
+        return TaskSchedulingBase.get_num_days(self)
 
     def get_cls(self, opt_mode: OptimizationMode):
         match opt_mode:
             case OptimizationMode.DURATION: return MinDurationModel
             case OptimizationMode.COST: return MinCostModel
             case OptimizationMode.RESOURCES: return MinResourcesModel
+            case OptimizationMode.DEVIATION: return MinDeviationModel
 
@@ -0,0 +1,169 @@
+import time
+
+from ortools.sat.python import cp_model
+
+from libs.model.solver_params import SolverParams
+from libs.model.telemetry import telemetry
+from libs.model.task_scheduling import TaskSchedulingBase, MinCostModel, MinResourcesModel, MinDurationModel
+
+
+def dominates(a, b):
+    # a is not worse than b in every objective and better in at least one
+    keys = ['duration', 'cost', 'resources']
+    return all(a[k] <= b[k] for k in keys) and any(a[k] < b[k] for k in keys)
+
+
+def non_dominated(solutions):
+    front = [s for s in solutions if not any(dominates(o, s) for o in solutions)]
+
+    # drop duplicates of the same point, keep the first found
+    unique = {}
+    for s in front:
+        unique.setdefault((s['duration'], s['cost'], s['resources']), s)
+
+    return sorted(unique.values(), key=lambda s: (s['duration'], s['cost'], s['resources']))
+
+
+class TaskSchedulingPareto(MinCostModel, MinResourcesModel, MinDurationModel):
+    """Duration / cost / resources trade-offs by epsilon-constraints on cost and resources."""
+
+    def __init__(self,
+                 resources: list,                   # (name, cost_hr, skills)
+                 tasks: list,                       # (name, effort_hrs, skill_required, depends_on_tasks)
+                 fixed_assignments: list = [],      # (task_id, resource_id)
+                 resource_constraints: list = [],   # (resource_id, start, end)
+                 task_constraints: list = [],       # (task_id, start, end)
+                 solver_params: SolverParams = SolverParams.default(),
+                 max_points: int = 20               # max points of the front to find
+                 ):
+
+        TaskSchedulingBase.__init__(self, resources, tasks, fixed_assignments, resource_constraints, task_constraints, solver_params)
+
+        self.max_points = max_points
+        self.__solver = None
+        self.__deadline = None
+        self.__solves_left = 0
+
+    def get_num_days(self):
+        # the cheapest & smallest team plans are on the front too, they may need the whole serial horizon
+        return TaskSchedulingBase.get_num_days(self)
+
+    def preprocess_model(self, model):
+        pass
+
+    def get_objective(self, model):
+        return MinDurationModel.get_objective(self, model)
+
+    def get_max_cost(self):
+        max_cost = 0
+        for (_, effort_hrs, _, _) in self.tasks:
+            max_cost += int(effort_hrs) * max([int(cost_hr) for (_, cost_hr, _) in self.resources], default=0)
+
+        return max_cost
+
+    def set_domain(self, var, lo, hi):
+        var.Proto().domain[:] = [lo, hi]
+
+    def minimize(self, model, objective):
+        model.Minimize(objective)
+
+        # the solves share the time budget, each one gets the rest of it over the solves left
+        max_time = None
+        if self.__deadline is not None:
+            remaining = self.__deadline - time.time()
+            if remaining <= 0:
+                return None
+            max_time = remaining / max(self.__solves_left, 1)
+        self.__solves_left -= 1
+
+        solver = cp_model.CpSolver()
+        self.setup_solver_params(solver, max_time=max_time)
+
+        if self.__solver is not None:
+            self.hint_solution(model, self.__solver)
+
+        solution_printer = self.get_printer()
+        with telemetry.phase('solve', model=type(self).__name__):
+            status = solver.Solve(model, solution_printer)
+        solution_printer.finish()
+        telemetry.add_solve(type(self).__name__, model, solver, solution_printer)
+        if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+            return None
+
+        self.__solver = solver
+        return solver
+
+    def solve_point(self, model, duration, cost):
+        # min duration, then min cost for that duration
+        solver = self.minimize(model, duration)
+        if solver is None:
+            return None
+
+        self.set_domain(duration, self.min_days, solver.Value(duration))
+        solver = self.minimize(model, cost)
+        self.set_domain(duration, self.min_days, self.num_days)
+
+        if solver is None:
+            return None
+
+        return self.to_results(solver)
+
+    def solve(self):
+        model = self.build_model()
+        self.preprocess_model(model)
+
+        duration = self.get_objective(model)
+
+        cost = model.NewIntVar(0, self.get_max_cost(), 'cost')
+        model.Add(cost == MinCostModel.get_objective(self, model))
+
+        resources = model.NewIntVar(0, self.num_workers, 'resources')
+        model.Add(resources == MinResourcesModel.get_objective(self, model))
+
+        print("Solving started...")
+        self.__solver = None
+        max_time = self.get_max_time()
+        self.__deadline = time.time() + max_time if max_time else None
+        # min resources, then min duration & min cost per point
+        self.__solves_left = 1 + 2 * self.max_points
+        solver = self.minimize(model, resources)
+        if solver is None:
+            print("No solution found.")
+            return []
+        min_resources = solver.Value(resources)
+
+        solutions = []
+        max_resources = self.num_workers
+
+        # epsilon-constraints: team size, then cost, while minimizing duration
+        while max_resources >= min_resources and len(solutions) < self.max_points:
+            self.set_domain(resources, 0, max_resources)
+            max_cost = self.get_max_cost()
+            level_resources = None
+
+            while len(solutions) < self.max_points:
+                self.set_domain(cost, 0, max_cost)
+                solution = self.solve_point(model, duration, cost)
+                if solution is None:
+                    break
+
+                print(f"Point found: duration = {solution['duration']}, "
+                      f"cost = {solution['cost']}, resources = {solution['resources']}")
+                solutions.append(solution)
+                level_resources = max(level_resources or 0, solution['resources'])
+                max_cost = solution['cost'] - 1
+
+            # no point within the team size, e.g. the solve ran out of time, the next smaller one is tried
+            self.set_domain(cost, 0, self.get_max_cost())
+            max_resources = (max_resources if level_resources is None else level_resources) - 1
+
+        front = non_dominated(solutions)
+        print(f'Pareto front: {len(front)} points\n')
+
+        return front
+
+
+def print_front(front):
+    print('Point   Duration           Cost   Resources')
+    for i, s in enumerate(front):
+        print('{:<5} {:>10} {:>14} {:>11}'.format(i, s['duration'], s['cost'], s['resources']))
@@ -0,0 +1,135 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+# response counters of the search, num_booleans & num_integers are the sizes of the presolved model
+RESPONSE_STATS = ['num_booleans', 'num_integers', 'num_conflicts', 'num_branches', 'num_binary_propagations',
+                  'num_integer_propagations', 'num_restarts', 'num_lp_iterations', 'wall_time', 'user_time',
+                  'deterministic_time', 'gap_integral']
+
+
+def get_model_size(model):
+    # variables, constraints & literals of a CpModel before presolve
+    proto = model.Proto()
+
+    literals = 0
+    for constraint in proto.constraints:
+        literals += len(constraint.enforcement_literal)
+        match constraint.WhichOneof('constraint'):
+            case 'bool_or': literals += len(constraint.bool_or.literals)
+            case 'bool_and': literals += len(constraint.bool_and.literals)
+            case 'at_most_one': literals += len(constraint.at_most_one.literals)
+            case 'exactly_one': literals += len(constraint.exactly_one.literals)
+            case 'bool_xor': literals += len(constraint.bool_xor.literals)
+
+    return {
+        'variables': len(proto.variables),
+        'booleans': sum(1 for v in proto.variables if len(v.domain) == 2 and v.domain[0] >= 0 and v.domain[1] <= 1),
+        'constraints': len(proto.constraints),
+        'literals': literals
+    }
+
+
+def get_response_stats(solver):
+    response = solver.ResponseProto()
+    stats = {k: getattr(response, k) for k in RESPONSE_STATS}
+    stats['status'] = solver.StatusName()
+    stats['objective_value'] = response.objective_value
+    stats['best_objective_bound'] = response.best_objective_bound
+
+    return stats
+
+
+class Telemetry:
+    """Wall time of run phases, model sizes, solver stats & incumbents of a run: JSON report & Chrome trace."""
+
+    def __init__(self):
+        # nothing is collected until enabled, e.g. by a requested run report
+        self.enabled = False
+        self.start_time = time.time()
+        # phases[i] -> {'name', 'start', 'duration', 'args'}, seconds since the start of the run
+        self.phases = []
+        # solves[i] -> {'name', 'start', 'model', 'response', 'incumbents', 'stop_reason'}
+        self.solves = []
+        self.__lock = threading.Lock()
+
+    def enable(self, start_time=None):
+        # a pool process reports against the start of the run of its parent
+        self.enabled = True
+        self.start_time = start_time or time.time()
+        self.phases = []
+        self.solves = []
+
+    @contextlib.contextmanager
+    def phase(self, name, **args):
+        start = time.time()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                with self.__lock:
+                    self.phases.append({'name': name, 'start': start - self.start_time,
+                                        'duration': time.time() - start, 'args': args})
+
+    def add_solve(self, name, model, solver, solution_printer):
+        # model size is read from the proto, only when the report is requested
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.solves.append({
+                'name': name,
+                'start': solution_printer.start_time - self.start_time,
+                'model': get_model_size(model),
+                'response': get_response_stats(solver),
+                'incumbents': [{**incumbent, 'time': incumbent['time'] + solution_printer.start_time - self.start_time}
+                               for incumbent in solution_printer.incumbents],
+                'stop_reason': solution_printer.stop_reason
+            })
+
+    def add_solves(self, solves, prefix):
+        # solves recorded by a pool process, e.g. weighted anchors
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.solves.extend({**solve, 'name': f"{prefix} {solve['name']}"} for solve in solves)
+
+    def get_report(self):
+        # total wall time per phase name & everything recorded
+        totals = {}
+        for phase in self.phases:
+            totals[phase['name']] = totals.get(phase['name'], 0) + phase['duration']
+
+        return {
+            'wall_time': time.time() - self.start_time,
+            'phase_totals': totals,
+            'phases': self.phases,
+            'solves': self.solves
+        }
+
+    def write_report(self, report_file):
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.get_report(), f, ensure_ascii=False, indent=4)
+
+    def write_trace(self, trace_file):
+        # chrome://tracing or ui.perfetto.dev: phases as spans, incumbents as an objective counter
+        pid = os.getpid()
+        events = [{'name': phase['name'], 'ph': 'X', 'pid': pid, 'tid': 0,
+                   'ts': phase['start'] * 1e6, 'dur': phase['duration'] * 1e6, 'args': phase['args']}
+                  for phase in self.phases]
+
+        for solve in self.solves:
+            for incumbent in solve['incumbents']:
+                events.append({'name': f"{solve['name']} objective", 'ph': 'C', 'pid': pid, 'tid': 0,
+                               'ts': incumbent['time'] * 1e6,
+                               'args': {'objective': incumbent['objective'], 'bound': incumbent['bound']}})
+
+        with open(trace_file, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+# one run per process, models & main.py report to the same telemetry
+telemetry = Telemetry()
@@ -1,18 +1,51 @@
 from pprint import pprint
-from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import contextlib
+import copy
+import glob
+import json
+import os
 import re
-import xmltodict, json
-from datetime import datetime
+import time
+from datetime import date
+from typing import NamedTuple
+from libs.examples.project_calendar import CalendarIndex, get_resource_constraints
+from libs.examples.project_xml import ProjectXmlReader, ProjectXmlWriter
 from libs.examples.solution_printer import SolutionPrinter
-from libs.examples.solution_builder import SolutionBuilder
-from libs.model.task_scheduling_multiopt import TaskSchedulingMultiOpt
-from libs.model.solver_params import SolverParams
+from libs.model.task_scheduling_lexicographic import TaskSchedulingLexicographic
+from libs.model.task_scheduling_intervals import ModelEngine, TaskSchedulingLexicographicIntervals, \
+    TaskSchedulingParetoIntervals
+from libs.model.task_scheduling_pareto import TaskSchedulingPareto, print_front
+from libs.model.task_scheduling_heuristic import TaskSchedulingHeuristic
+from libs.model.dependency_graph import DependencyGraph, LinkType
+from libs.model.horizon import HorizonEstimator
+from libs.model.durations import max_duration
+from libs.model.task_scheduling_multiopt import OptimizationMode
+from libs.model.solver_params import SolverParams, PROFILES_FILE
+from libs.model.solve_cache import SolveCache, to_task_assignments
+from libs.model.task_scheduling_decomposition import TaskSchedulingDecomposition
+from libs.model.task_scheduling_lns import TaskSchedulingLNS
+from libs.model.task_scheduling_exact import TaskSchedulingExact
+from libs.model.telemetry import telemetry
 
 
-INPUT_JSON = './tmp/input.json'
-OUTPUT_JSON = './tmp/out.json'
+DRAFT_MODE = 'draft'
 RES_DIR = './results'
+CACHE_DIR = './.cache/solutions'
+# rounds of calendar expansion, the horizon is at least doubled per round
+CALENDAR_ROUNDS = 4
+
+
+class Problem(NamedTuple):
+    tasks: list                 # (uid, name, work, [PredecessorLink])
+    algo_tasks: list            # (uid, effort_hrs, skill_required, depends_on_tasks)
+    resources: list             # (uid, cost_hr, skills)
+    resource_constraints: list  # (resource_id, start, end) from resource calendars
+    calendar: CalendarIndex     # solver days are working days of the project calendar
+    fixed_assignments: list = []    # (task_id, resource_id), e.g. tasks started by the previous plan
+    task_constraints: list = []     # (task_id, start, end)
+
 
 def get_task_skill(t_skill):
     skills = ['Тестирование', 'Разработка', 'Аналитика']
@@ -22,28 +55,70 @@ def get_task_skill(t_skill):
     else:
         return t_skill
 
-def get_obj_dict(obj):
-    return obj.__dict__
-
 def get_price(name):
     t = re.search('\((.*?)руб', name)
     return int(t.group(1))
 
-def find_uid_index(uid, tasks):
-    i=0
-    for t in tasks:
-        (t_uid, *_) = t
-        if t_uid == uid:
-            return i
-        i+=1
-    
-    return None
-
 def get_effort(effort_str):
     return int(effort_str[2: effort_str.index('H')])
 
-def get_role(resource):
-    return resource.Name[:resource.Name.index(' ')]
+def get_lag_days(link_lag):
+    # LinkLag is in tenths of a minute, 8 hours working day
+    return round(link_lag / 4800)
+
+def get_dependencies(uid, links, uid_index, leaves={}):
+    # a link from a summary is a link from every scheduled task under it, links to tasks which are not scheduled
+    # (milestones) are left out
+    dependencies = []
+    for link in links:
+        uids = [link.predecessor_uid] if link.predecessor_uid in uid_index else leaves.get(link.predecessor_uid, [])
+        if not uids:
+            print(f'Link of task {uid} to {link.predecessor_uid} is left out, {link.predecessor_uid} is not scheduled')
+
+        dependencies.extend((uid_index[p], LinkType(link.type), get_lag_days(link.lag)) for p in uids if p != uid)
+
+    return dependencies
+
+def get_leaves(project_tasks, uid_index):
+    # leaves[summary uid] -> scheduled tasks under the summary, nested summaries included
+    leaves = {}
+    for s in project_tasks:
+        if s.summary:
+            prefix = s.outline_number + '.'
+            leaves[s.uid] = [t.uid for t in project_tasks if t.outline_number.startswith(prefix) and t.uid in uid_index]
+
+    return leaves
+
+def get_summary_links(project_tasks, task):
+    # links of the summaries above a task, MS Project schedules every task under a summary after its predecessors
+    summaries = {t.outline_number: t for t in project_tasks if t.summary}
+    parts = task.outline_number.split('.')
+
+    links = []
+    for i in range(1, len(parts)):
+        summary = summaries.get('.'.join(parts[:i]))
+        if summary is not None:
+            links.extend(summary.predecessors)
+
+    return links
+
+def to_algo_tasks(tasks, leaves={}):
+    uid_index = {uid: i for i, (uid, *_) in enumerate(tasks)}
+
+    algo_tasks = []
+    for t in tasks:
+        (uid, name, effort_str, links) = t
+        algo_tasks.append((uid, get_effort(effort_str), get_task_skill(clear_task_name(name)),
+                           get_dependencies(uid, links, uid_index, leaves)))
+
+    cycle = DependencyGraph(algo_tasks).find_cycle()
+    if cycle is not None:
+        raise ValueError('Dependency cycle: ' + ' -> '.join(tasks[t][0] for t in cycle))
+
+    return algo_tasks
+
+def get_role(name):
+    return name[:name.index(' ')]
 
 def clear_task_name(task_name):
     if ' ' in task_name:
@@ -51,27 +126,40 @@ def clear_task_name(task_name):
     else:
         return task_name
 
-def process_json(args):
-    data = json.load(open(INPUT_JSON, encoding="utf-8"), object_hook=lambda d: SimpleNamespace(**d))
+def get_model_cls(engine):
+    match engine:
+        case ModelEngine.DAYS: return TaskSchedulingLexicographic
+        case ModelEngine.INTERVALS: return TaskSchedulingLexicographicIntervals
+
+    raise ValueError(f'Unknown model engine: {engine}')
+
+def get_pareto_cls(engine):
+    match engine:
+        case ModelEngine.DAYS: return TaskSchedulingPareto
+        case ModelEngine.INTERVALS: return TaskSchedulingParetoIntervals
+
+    raise ValueError(f'Unknown model engine: {engine}')
+
+def read_problem(input_file):
+    with telemetry.phase('parse_xml', input_file=input_file):
+        project = ProjectXmlReader().read(input_file)
 
     tasks = []
-    for t in data.Project.Tasks.Task:
-        if t.Summary == "1" or "Веха" in t.Name:
+    for t in project.tasks:
+        if t.summary or "Веха" in t.name:
             continue
-        if not hasattr(t, 'PredecessorLink'):
-            tasks.append((t.UID, t.Name, t.Work, []))
+        links = t.predecessors + get_summary_links(project.tasks, t)
+        if not links:
+            tasks.append((t.uid, t.name, t.work, []))
         else:
-            if not hasattr(t, 'Work'):
-                tasks.append((t.UID, t.Name, "No0H", []))
+            if t.work is None:
+                tasks.append((t.uid, t.name, "No0H", []))
             else:
-                tasks.append((t.UID, t.Name, t.Work, [t.PredecessorLink.PredecessorUID]))
+                tasks.append((t.uid, t.name, t.work, links))
     # pprint(tasks)
 
-    algo_tasks = []
-    for t in tasks:
-        (uid, name, effort_str, deps) = t
-        deps_idx = [find_uid_index(deps[0] , tasks)] if len(deps)> 0 else []
-        algo_tasks.append((uid, get_effort(effort_str), get_task_skill(clear_task_name(name)), deps_idx))
+    uid_index = {uid: i for i, (uid, *_) in enumerate(tasks)}
+    algo_tasks = to_algo_tasks(tasks, get_leaves(project.tasks, uid_index))
     pprint(algo_tasks)
 
     skill_mapping = {'Тестировщик': 'Тестирование', 
@@ -83,59 +171,418 @@ def process_json(args):
     # pprint(skill_mapping)
 
     resources = []
-    for r in data.Project.Resources.Resource:
-        if get_role(r) not in skill_mapping:
+    for r in project.resources:
+        if get_role(r.name) not in skill_mapping:
             continue
-        resources.append((r.UID, get_price(r.Name), [skill_mapping[get_role(r)]]))
+        resources.append((r.uid, get_price(r.name), [skill_mapping[get_role(r.name)]]))
 
     pprint(resources)
 
-    s_params = SolverParams.default()
-    s_params.max_iteration_search_time = args.max_time
-    model = TaskSchedulingMultiOpt(resources, algo_tasks, opt_mode=args.mode_list, solver_params=s_params)
-    solution = model.solve()
+    with telemetry.phase('calendar'):
+        resource_constraints = get_calendar_constraints(project, resources, algo_tasks)
+    calendar = CalendarIndex(project.calendars, project.calendar_uid, project.start_date)
+
+    return Problem(tasks, algo_tasks, resources, resource_constraints, calendar)
+
+def get_calendar_constraints(project, resources, algo_tasks):
+    # resource calendars up to the serial horizon on them, so the models' horizon is always within the calendars;
+    # the horizon is at least doubled per round, the last round expands the calendars to its bound whatever it is
+    num_days = HorizonEstimator(resources, algo_tasks).serial_bound()
+    for _ in range(CALENDAR_ROUNDS):
+        resource_constraints = get_resource_constraints(project, resources, num_days)
+        bound = HorizonEstimator(resources, algo_tasks, resource_constraints=resource_constraints).serial_bound()
+        if bound <= num_days:
+            return resource_constraints
+
+        num_days = max(bound, 2 * num_days)
+
+    print(f'Calendars are expanded to {num_days} days, the plan may be cut short by later unavailability')
+    return get_resource_constraints(project, resources, num_days)
+
+def read_baseline(plan_file, problem):
+    # (task_assignments, status date) of a previously written plan on the current tasks & resources, current durations;
+    # tasks assigned by hand to a worker without their skill are left out, so they are re-planned as not started
+    with telemetry.phase('parse_xml', input_file=plan_file):
+        plan = ProjectXmlReader().read(plan_file)
+    task_index = {uid: t for t, (uid, *_) in enumerate(problem.algo_tasks)}
+    worker_index = {uid: w for w, (uid, *_) in enumerate(problem.resources)}
+
+    workers = {}
+    for a in plan.assignments:
+        workers.setdefault(a.task_uid, a.resource_uid)
+
+    baseline = {}
+    for task in plan.tasks:
+        t = task_index.get(task.uid)
+        w = worker_index.get(workers.get(task.uid))
+        if t is None or w is None or task.start is None:
+            continue
+        if not is_eligible(problem, t, w):
+            print(f'Task {problem.algo_tasks[t][0]} is assigned to {problem.resources[w][0]} without the skill, '
+                  f'it is re-planned')
+            continue
+
+        start = problem.calendar.to_day(task.start.date())
+        baseline[t] = (start, start + max_duration([problem.algo_tasks[t]]), w)
+
+    return (baseline, plan.status_date)
+
+def is_eligible(problem, t, w):
+    (*_, skill_required, _) = problem.algo_tasks[t]
+    return not skill_required or skill_required in problem.resources[w][2]
+
+def freeze_started(problem, baseline, status_day):
+    # tasks started before the status day keep their start & worker, the rest can't start in the past
+    fixed_assignments = []
+    task_constraints = []
+    for t in range(len(problem.algo_tasks)):
+        if t in baseline and baseline[t][0] < status_day:
+            (start, end, w) = baseline[t]
+            fixed_assignments.append((t, w))
+            task_constraints.append((t, start, end))
+        else:
+            task_constraints.append((t, status_day, None))
+
+    return problem._replace(fixed_assignments=fixed_assignments, task_constraints=task_constraints)
+
+def solve_problem(problem, mode_list, engine, s_params, cache=None, baseline=None, decompose=False, lns_time=0):
+    if cache is not None:
+        (tasks_key, key) = cache.get_keys(problem.algo_tasks, problem.resources, problem.fixed_assignments,
+                                          problem.resource_constraints, problem.task_constraints, mode_list,
+                                          {'engine': engine, 'solver_params': s_params, 'baseline': baseline,
+                                           'decompose': decompose, 'lns_time': lns_time})
+        solution = cache.get(tasks_key, key)
+        if solution is not None:
+            print(f"Solution found in cache. Total objective func = {solution['objective_value']}\n")
+            return solution
+
+    # instant heuristic plan: either the answer itself or a warm start for the solver
+    opt_mode = [m for m in mode_list if m != DRAFT_MODE]
+    with telemetry.phase('draft'):
+        draft = TaskSchedulingHeuristic(problem.resources, problem.algo_tasks, opt_mode=opt_mode,
+                                        fixed_assignments=problem.fixed_assignments,
+                                        resource_constraints=problem.resource_constraints,
+                                        task_constraints=problem.task_constraints).solve()
+
+    # pre-solve: closed-form optimum when timing doesn't matter to the objectives, otherwise cost first
+    # is narrowed down to the cheapest workers and the rest is left to CP-SAT
+    exact = None
+    fixed_assignments = problem.fixed_assignments
+    if DRAFT_MODE not in mode_list:
+        with telemetry.phase('exact'):
+            analyzer = TaskSchedulingExact(problem.resources, problem.algo_tasks, opt_mode,
+                                           fixed_assignments=problem.fixed_assignments,
+                                           resource_constraints=problem.resource_constraints,
+                                           task_constraints=problem.task_constraints)
+            # the closest plan to the baseline needs the solver
+            if baseline is None:
+                exact = analyzer.solve()
+            fixed_assignments = analyzer.get_fixed_assignments() or problem.fixed_assignments
+
+    if DRAFT_MODE in mode_list:
+        solution = draft
+    elif exact is not None:
+        solution = exact
+    elif decompose:
+        # independent workstreams in parallel, the merged plan is repaired on shared workers
+        model = TaskSchedulingDecomposition(get_model_cls(engine), problem.resources, problem.algo_tasks, opt_mode,
+                                            fixed_assignments=fixed_assignments,
+                                            resource_constraints=problem.resource_constraints,
+                                            task_constraints=problem.task_constraints, solver_params=s_params)
+        solution = model.solve()
+    elif lns_time:
+        # the draft is improved by re-solving neighbourhoods of it within lns_time seconds each
+        model = TaskSchedulingLNS(get_model_cls(engine), problem.resources, problem.algo_tasks, opt_mode,
+                                  fixed_assignments=fixed_assignments,
+                                  resource_constraints=problem.resource_constraints,
+                                  task_constraints=problem.task_constraints, solver_params=s_params,
+                                  neighbourhood_time=lns_time)
+        if draft is not None:
+            model.set_warm_start(draft['task_assignments'])
+
+        solution = model.solve()
+    else:
+        # re-planning: the closest plan to the previous one among the optimal ones
+        if baseline is not None:
+            opt_mode = opt_mode + [OptimizationMode.DEVIATION]
+
+        model_cls = get_model_cls(engine)
+        model = model_cls(problem.resources, problem.algo_tasks, opt_mode=opt_mode,
+                          fixed_assignments=fixed_assignments,
+                          resource_constraints=problem.resource_constraints,
+                          task_constraints=problem.task_constraints, solver_params=s_params)
+
+        # a cached plan of the same tasks, e.g. before a resource change, is usually closer than the draft
+        assignments = cache.get_assignments(tasks_key) if cache is not None else None
+        if baseline is not None:
+            model.set_baseline(baseline)
+            model.set_warm_start(baseline)
+        elif assignments is not None:
+            print('Solution of the same tasks found in cache, used as a hint\n')
+            model.set_warm_start(to_task_assignments(assignments, problem.resources, problem.algo_tasks))
+        elif draft is not None:
+            model.set_warm_start(draft['task_assignments'])
+
+        solution = model.solve()
+
+    if cache is not None and solution is not None:
+        cache.put(tasks_key, key, solution, problem.resources)
+
+    return solution
+
+def get_cache(args):
+    if args.no_cache:
+        return None
+
+    return SolveCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+def get_solver_params(args):
+    # a profile budgets time by problem size, -t caps it
+    if args.profile:
+        s_params = SolverParams.from_profile(args.profile, args.profiles_file)
+    else:
+        s_params = SolverParams.default()
+
+    if args.max_time:
+        s_params.max_iteration_search_time = args.max_time
+    if args.gap is not None:
+        s_params.relative_gap_limit = args.gap
+    if args.no_improvement_time is not None:
+        s_params.no_improvement_time = args.no_improvement_time
+    if args.no_symmetry_breaking:
+        s_params.symmetry_breaking = False
+    if args.redundant:
+        s_params.redundant_constraints = True
+
+    return s_params
+
+def process_xml(args):
+    problem = read_problem(args.input_file)
+
+    baseline = None
+    if args.replan:
+        (baseline, plan_status_date) = read_baseline(args.replan, problem)
+        status_date = args.status_date or (plan_status_date and plan_status_date.date())
+        if status_date is None:
+            raise ValueError(f'{args.replan} has no StatusDate, --status-date is required')
+
+        problem = freeze_started(problem, baseline, problem.calendar.to_day(status_date))
+
+    s_params = get_solver_params(args)
+
+    if args.pareto:
+        process_pareto(args, problem, s_params)
+        return
+
+    solution = solve_problem(problem, args.mode_list, args.engine, s_params, get_cache(args), baseline,
+                             args.decompose, args.lns)
 
     printer = SolutionPrinter()
     print('\nTask assignments:')
-    printer.print_task_assignments(tasks, resources, solution['task_assignments'])
+    printer.print_task_assignments(problem.tasks, problem.resources, solution['task_assignments'])
     print('\n=============================\n'
         'Resources assignments:')
-    printer.print_workers_tasks(tasks, resources, solution['workers_assignments'])
+    printer.print_workers_tasks(problem.tasks, problem.resources, solution['workers_assignments'])
+
+    write_solution(args.input_file, problem, solution, args.output_file)
+
+    if 'curve' in solution:
+        write_curve(solution['curve'], args.output_file)
+
+def write_curve(curve, output_file):
+    # objective over time of an LNS run, to compare with a single solve
+    (output_stem, _) = os.path.splitext(output_file)
+    with open(f'{output_stem}_lns.csv', 'w', encoding='utf-8') as f:
+        f.write('time,objective_value\n')
+        for (seconds, objective_value) in curve:
+            f.write(f'{seconds:.2f},{objective_value}\n')
+
+def process_pareto(args, problem, s_params):
+    model_cls = get_pareto_cls(args.engine)
+    model = model_cls(problem.resources, problem.algo_tasks, fixed_assignments=problem.fixed_assignments,
+                      resource_constraints=problem.resource_constraints, task_constraints=problem.task_constraints,
+                      solver_params=s_params, max_points=args.pareto)
+    front = model.solve()
+
+    print_front(front)
 
-    builder = SolutionBuilder()
-    builder.reassign(data, tasks, resources, solution['task_assignments'])
-    builder.update_parents_dates(data)
+    (output_stem, output_ext) = os.path.splitext(args.output_file)
+    with open(f'{output_stem}_pareto.csv', 'w', encoding='utf-8') as f:
+        f.write('point,duration,cost,resources,output_file\n')
 
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(data, f, default=get_obj_dict, ensure_ascii=False, indent=4)
+        for i, solution in enumerate(front):
+            output_file = f'{output_stem}_{i}{output_ext}'
+            write_solution(args.input_file, problem, solution, output_file)
+            f.write(f"{i},{solution['duration']},{solution['cost']},{solution['resources']},{output_file}\n")
+
+def batch_job(input_file, output_file, mode_list, engine, s_params, num_search_workers, cache):
+    # one file of a batch, runs in a pool process; solver output goes to <output>.log
+    result = {
+        'input_file': input_file,
+        'output_file': output_file,
+        'status': 'error',
+        'objective_value': None,
+        'duration': None,
+        'cost': None,
+        'resources': None,
+        'time': 0,
+        'error': None
+    }
+
+    start = time.time()
+    log_file = os.path.splitext(output_file)[0] + '.log'
+    with open(log_file, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        try:
+            problem = read_problem(input_file)
+
+            s_params = copy.copy(s_params)
+            s_params.num_search_workers = num_search_workers
+
+            solution = solve_problem(problem, mode_list, engine, s_params, cache)
+            if solution is None:
+                result['status'] = 'no_solution'
+            else:
+                write_solution(input_file, problem, solution, output_file)
+                result['status'] = 'ok'
+                for k in ['objective_value', 'duration', 'cost', 'resources']:
+                    result[k] = solution[k]
+        except Exception as e:
+            result['error'] = repr(e)
+            print(result['error'])
 
-    with open(args.output_file, 'w', encoding='utf-8') as f:
-        xml_content = xmltodict.unparse(json.load(open(OUTPUT_JSON, encoding='utf-8')), pretty=True)
-        f.write(xml_content)
+    result['time'] = time.time() - start
+    return result
 
-def convert_xml_to_json(args):
-    with open(args.input_file, encoding="utf-8") as fd:
-        doc = xmltodict.parse(fd.read())
+def get_batch_files(batch):
+    if os.path.isdir(batch):
+        return sorted(glob.glob(os.path.join(batch, '*.xml')))
 
-    with open(INPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(doc, f, ensure_ascii=False, indent = 4)
+    return sorted(glob.glob(batch))
+
+def process_batch(args):
+    input_files = get_batch_files(args.batch)
+    os.makedirs(args.output_file, exist_ok=True)
+
+    # cores are split between jobs
+    num_jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(input_files)))
+    num_search_workers = max(1, (os.cpu_count() or 1) // num_jobs)
+    print(f'Batch of {len(input_files)} files, {num_jobs} jobs x {num_search_workers} search workers')
+
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        futures = []
+        for i, input_file in enumerate(input_files):
+            name = os.path.splitext(os.path.basename(input_file))[0]
+            # same file names may come from different directories
+            output_file = os.path.join(args.output_file, f'{i}_{name}.xml')
+            futures.append(executor.submit(batch_job, input_file, output_file,
+                                           args.mode_list, args.engine, get_solver_params(args), num_search_workers,
+                                           get_cache(args)))
+
+        manifest = []
+        for future in futures:
+            result = future.result()
+            manifest.append(result)
+            print('{:<8} {:>8.2f} s  {}'.format(result['status'], result['time'], result['input_file']))
+
+    with open(os.path.join(args.output_file, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+def write_solution(input_file, problem, solution, output_file):
+    with telemetry.phase('write_xml', output_file=output_file):
+        writer = ProjectXmlWriter(input_file, problem.calendar)
+        writer.reassign(problem.tasks, problem.resources, solution['task_assignments'])
+        writer.update_parents_dates()
+        writer.write(output_file)
 
 # export PYTHONPATH=/home/vladimir/Work/microbo/hack-it-purple-2024
 # python main.py -i "./inputs/v2/тестовое задание.xml" -o ./results/result_2.xml -m duration
 # python main.py -i "./inputs/new/исходные данные.xml" -o ./results/result_1.xml -m duration
 # python main.py -i "./inputs/final/проверочное задание.xml" -o ./results/final_duration.xml -m duration
+# python main.py -i "./inputs/final/проверочное задание.xml" -o ./results/final_duration.xml -m duration -e intervals
+# python main.py -i "./inputs/new/исходные данные.xml" -o ./results/pareto.xml -p 10 -e intervals
+# python main.py -i "./inputs/final/проверочное задание.xml" -o ./results/final_draft.xml -m draft duration
+# python main.py -b "./inputs/*/*.xml" -o ./results/batch -m duration cost -e intervals -t 60
+# python main.py -i "./inputs/final/проверочное задание.xml" -o ./results/final_decomposed.xml -m duration -e intervals --decompose
+# python main.py -i "./inputs/final/проверочное задание.xml" -o ./results/final_lns.xml -m duration -e intervals -t 120 --lns 10
+# python main.py -i "./inputs/new/исходные данные.xml" -o ./results/replan.xml -m duration -r ./results/duration.xml --status-date 2024-03-01
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Sber Tech Task Scheduler')
     parser.add_argument('-i', '--input-file', type=str,
-                        help='input xml file', required=True)
+                        help='input xml file')
     parser.add_argument('-o', '--output-file', type=str,
-                        help='output xml file', required=True)
-    parser.add_argument('-t', '--max-time', type=int, default=600,
-                        help='Max iteration search time in seconds')
-    parser.add_argument('-m', '--mode-list', nargs='+', type=str, required=True,
-                        help='duration, cost, resources')
+                        help='output xml file, output directory for a batch', required=True)
+    parser.add_argument('-b', '--batch', type=str,
+                        help='directory or glob of input xml files, scheduled in parallel')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='batch jobs run at once, by default one per cpu')
+    parser.add_argument('-t', '--max-time', type=int,
+                        help='Max iteration search time in seconds, 600 by default or the cap of a profile')
+    parser.add_argument('-m', '--mode-list', nargs='+', type=str,
+                        help='duration, cost, resources; draft - heuristic plan only, ranked by the rest')
+    parser.add_argument('-p', '--pareto', type=int, default=0,
+                        help='Pareto front mode: max number of points, one output xml per point')
+    parser.add_argument('--profile', type=str,
+                        help='draft, balanced, fine: time budget by tasks x workers x horizon & split between stages')
+    parser.add_argument('--profiles-file', type=str, default=PROFILES_FILE,
+                        help='json file of named solver profiles')
+    parser.add_argument('--gap', type=float,
+                        help='stop a solve once the relative gap to the best bound is below, e.g. 0.01')
+    parser.add_argument('--no-improvement-time', type=float,
+                        help='stop a solve after seconds without a better solution')
+    parser.add_argument('--no-symmetry-breaking', action='store_true',
+                        help='treat workers with the same skills, cost & calendar as distinct')
+    parser.add_argument('--redundant', action='store_true',
+                        help='add cumulative constraints per skill & energy bounds on the duration')
+    parser.add_argument('-e', '--engine', type=str, default=ModelEngine.DAYS.value,
+                        help='days, intervals')
+    parser.add_argument('-r', '--replan', type=str,
+                        help='previous output xml: started tasks are kept, changes to the rest are minimized')
+    parser.add_argument('--status-date', type=date.fromisoformat,
+                        help='re-planning date, YYYY-MM-DD: tasks started before it are kept, '
+                             'the StatusDate of the -r plan by default')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='solve even if the same problem was solved before, don\'t store the solution')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR,
+                        help='solutions cache directory')
+    parser.add_argument('--cache-size', type=int, default=256,
+                        help='solutions cache size in MB, least recently used solutions are evicted')
+    parser.add_argument('--decompose', action='store_true',
+                        help='solve independent workstreams in parallel and merge them, for large projects')
+    parser.add_argument('--lns', type=int, default=0,
+                        help='large neighbourhood search: seconds per neighbourhood, the draft plan is improved '
+                             'by re-solving parts of it in parallel until -t; objective over time to <output>_lns.csv')
+    parser.add_argument('--report', type=str,
+                        help='json run report: wall time per phase, model sizes, solver stats & incumbents')
+    parser.add_argument('--trace', type=str,
+                        help='chrome trace json of the run phases & incumbents, for chrome://tracing or perfetto')
 
     args = parser.parse_args()
+    if not args.mode_list and not args.pareto:
+        parser.error('either -m/--mode-list or -p/--pareto is required')
+    if not args.input_file and not args.batch:
+        parser.error('either -i/--input-file or -b/--batch is required')
+    if args.replan and args.batch:
+        parser.error('-r/--replan is for a single -i/--input-file')
+    if args.pareto and args.batch:
+        parser.error('-p/--pareto is for a single -i/--input-file')
+    if args.decompose and (args.batch or args.replan or args.pareto):
+        parser.error('--decompose is for a single -i/--input-file with -m/--mode-list')
+    if args.lns and (args.batch or args.replan or args.pareto or args.decompose):
+        parser.error('--lns is for a single -i/--input-file with -m/--mode-list')
+
+    if (args.report or args.trace) and args.batch:
+        parser.error('--report/--trace are for a single -i/--input-file')
+
+    if args.report or args.trace:
+        telemetry.enable()
+
+    if args.batch:
+        process_batch(args)
+    else:
+        with telemetry.phase('run'):
+            process_xml(args)
 
-    convert_xml_to_json(args)
-    process_json(args)
+    if args.report:
+        telemetry.write_report(args.report)
+    if args.trace:
+        telemetry.write_trace(args.trace)
@@ -0,0 +1,467 @@
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs, quote
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import uuid
+
+from libs.model.solver_params import SolverParams, PROFILES_FILE
+from libs.model.task_scheduling_intervals import ModelEngine, TaskSchedulingMultiOptIntervals, \
+    TaskSchedulingMultiOptWeightsIntervals
+from libs.model.task_scheduling_multiopt import TaskSchedulingMultiOpt, OptimizationMode
+from libs.model.task_scheduling_multiopt_weights import TaskSchedulingMultiOptWeights
+from main import read_problem, write_solution
+
+JOBS_DIR = './.cache/jobs'
+SEARCH_WORKERS = 4                      # search workers of a job by default, jobs run at once share the cores
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024      # bytes of an uploaded xml
+KEEPALIVE_TIME = 15                     # seconds between comments of an idle event stream
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINAL_STATUSES = ['ok', 'no_solution', 'error', 'cancelled']
+
+HTTP_REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+class JobEvents:
+    """Incumbents of a job to the queue shared by all jobs, as (job_id, event); picklable for anchor processes."""
+
+    def __init__(self, job_id, events):
+        self.job_id = job_id
+        self.events = events
+
+    def put(self, incumbent):
+        self.events.put((self.job_id, {'type': 'incumbent', **incumbent}))
+
+
+def parse_options(query):
+    # ?mode=duration,cost or ?weights=duration:0.4,cost:0.4,resources:0.2, &engine=intervals&max_time=60&profile=draft
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    options = {
+        'name': params.get('name', 'project'),
+        'mode_list': None,
+        'weights': None,
+        'engine': params.get('engine', ModelEngine.INTERVALS.value),
+        'max_time': None,
+        'profile': params.get('profile')
+    }
+
+    try:
+        if 'weights' in params:
+            options['weights'] = {OptimizationMode(k).value: float(v)
+                                  for (k, v) in (item.split(':') for item in params['weights'].split(','))}
+        else:
+            options['mode_list'] = [OptimizationMode(m).value for m in params.get('mode', 'duration').split(',')]
+
+        ModelEngine(options['engine'])
+        if 'max_time' in params:
+            options['max_time'] = int(params['max_time'])
+        if options['profile']:
+            SolverParams.from_profile(options['profile'], PROFILES_FILE)
+    except ValueError as e:
+        raise HttpError(400, f'Bad job options: {e}')
+
+    if OptimizationMode.DEVIATION.value in (options['mode_list'] or options['weights']):
+        raise HttpError(400, 'Bad job options: deviation needs a baseline plan, re-planning is done by main.py -r')
+
+    return options
+
+
+def get_model(problem, options, s_params):
+    # TaskSchedulingMultiOpt by priorities or TaskSchedulingMultiOptWeights by weights, of the requested engine
+    kwargs = {'fixed_assignments': problem.fixed_assignments, 'resource_constraints': problem.resource_constraints,
+              'task_constraints': problem.task_constraints, 'solver_params': s_params}
+
+    if options['weights']:
+        model_cls = TaskSchedulingMultiOptWeightsIntervals if options['engine'] == ModelEngine.INTERVALS \
+            else TaskSchedulingMultiOptWeights
+        return model_cls(problem.resources, problem.algo_tasks, options['weights'], **kwargs)
+
+    model_cls = TaskSchedulingMultiOptIntervals if options['engine'] == ModelEngine.INTERVALS \
+        else TaskSchedulingMultiOpt
+    return model_cls(problem.resources, problem.algo_tasks, options['mode_list'], **kwargs)
+
+
+def run_job(job_id, job_dir, options, num_search_workers, events, stop_event):
+    # runs in a pool process; solver output goes to job.log, progress to the events queue
+    result = {'status': 'error', 'objective_value': None, 'duration': None, 'cost': None, 'resources': None,
+              'error': None}
+    events.put((job_id, {'type': 'status', 'status': RUNNING}))
+
+    input_file = os.path.join(job_dir, 'input.xml')
+    with open(os.path.join(job_dir, 'job.log'), 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        # processes of weighted anchors write to the inherited descriptor
+        sys.__stdout__.flush()
+        os.dup2(log.fileno(), sys.__stdout__.fileno())
+        try:
+            problem = read_problem(input_file)
+
+            s_params = SolverParams.from_profile(options['profile'], PROFILES_FILE) if options['profile'] \
+                else SolverParams.default()
+            if options['max_time']:
+                s_params.max_iteration_search_time = options['max_time']
+            s_params.num_search_workers = num_search_workers
+
+            model = get_model(problem, options, s_params)
+            model.set_progress(JobEvents(job_id, events), stop_event)
+            solution = model.solve()
+
+            # a cancelled search keeps its best plan so far, it is written & downloadable as well
+            if solution is None:
+                result['status'] = 'cancelled' if stop_event.is_set() else 'no_solution'
+            else:
+                write_solution(input_file, problem, solution, os.path.join(job_dir, 'output.xml'))
+                result['status'] = 'cancelled' if stop_event.is_set() else 'ok'
+                for k in ['objective_value', 'duration', 'cost', 'resources']:
+                    result[k] = solution[k]
+        except Exception as e:
+            # a stopped solve may leave the next stage without a solution
+            result['status'] = 'cancelled' if stop_event.is_set() else 'error'
+            result['error'] = repr(e)
+            print(result['error'])
+
+    return result
+
+
+class Job:
+    def __init__(self, job_id, job_dir, options, stop_event):
+        self.id = job_id
+        self.dir = job_dir
+        self.options = options
+        self.stop_event = stop_event
+
+        self.status = QUEUED
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        # incumbents[i] -> {'type': 'incumbent', 'time', 'objective', 'bound', 'stage'}, replayed to new event streams;
+        # stage is the objective of a multi-objective stage or of a weighted anchor, values of stages don't compare
+        self.incumbents = []
+        # queues of the open event streams
+        self.subscribers = set()
+        self.future = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.options['name'],
+            'status': self.status,
+            'options': {k: v for k, v in self.options.items() if k != 'name'},
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'incumbents': len(self.incumbents),
+            'objective': self.incumbents[-1]['objective'] if self.incumbents else None,
+            'result': self.result
+        }
+
+
+class SchedulingService:
+    """Local HTTP service: xml uploads are solved as jobs on a bounded process pool, progress is streamed as SSE."""
+
+    # POST   /jobs?mode=duration,cost       xml body -> job, or ?weights=duration:0.4,cost:0.4,resources:0.2
+    # GET    /jobs                          all jobs
+    # GET    /jobs/<id>                     job status & result totals
+    # GET    /jobs/<id>/events              server-sent events: incumbents, then the final status
+    # GET    /jobs/<id>/result              scheduled xml, the best plan so far of a cancelled job
+    # GET    /jobs/<id>/log                 solver output
+    # DELETE /jobs/<id>                     cancel: a queued job is dropped, a running one stops its search
+
+    ROUTES = [
+        ('GET', r'/jobs/?', 'list_jobs'),
+        ('POST', r'/jobs/?', 'create_job'),
+        ('GET', r'/jobs/(?P<job_id>\w+)', 'get_job'),
+        ('DELETE', r'/jobs/(?P<job_id>\w+)', 'cancel_job'),
+        ('GET', r'/jobs/(?P<job_id>\w+)/events', 'stream_events'),
+        ('GET', r'/jobs/(?P<job_id>\w+)/result', 'get_result'),
+        ('GET', r'/jobs/(?P<job_id>\w+)/log', 'get_log')
+    ]
+
+    def __init__(self, jobs_dir: str, num_jobs: int):
+        self.jobs_dir = jobs_dir
+        self.num_jobs = num_jobs
+        # cores are split between jobs, so jobs run at once don't oversubscribe them
+        self.num_search_workers = max(1, (os.cpu_count() or 1) // num_jobs)
+        self.jobs = {}
+
+        # spawned processes don't inherit the event loop & the threads of the service
+        context = multiprocessing.get_context('spawn')
+        self.manager = context.Manager()
+        self.events = self.manager.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=num_jobs, mp_context=context)
+        self.loop = None
+        self.closing = False
+
+    def pump_events(self):
+        # runs in a thread: progress of all jobs from the pool processes to the event loop, None to stop
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+
+            self.loop.call_soon_threadsafe(self.on_event, *item)
+
+    def publish(self, job, event):
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def on_event(self, job_id, event):
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINAL_STATUSES:
+            return
+
+        match event['type']:
+            case 'status':
+                job.status = event['status']
+                job.started = time.time()
+            case 'incumbent':
+                job.incumbents.append(event)
+            case 'done':
+                # after the incumbents of the job, they are put to the same queue before it returns
+                (job.status, job.result) = self.get_outcome(job)
+                job.finished = time.time()
+                event = {'type': 'status', 'status': job.status}
+
+        self.publish(job, event)
+
+    def get_outcome(self, job):
+        if job.future.cancelled():
+            return ('cancelled', None)
+        if job.future.exception() is not None:
+            return ('error', {'error': repr(job.future.exception())})
+
+        result = job.future.result()
+        return (result['status'], result)
+
+    def on_done(self, job):
+        # the done marker goes through the events queue, so the stream gets every incumbent first
+        if self.closing:
+            return
+
+        self.loop.run_in_executor(None, self.events.put, (job.id, {'type': 'done'}))
+
+    def submit(self, options, body):
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, 'input.xml'), 'wb') as f:
+            f.write(body)
+
+        job = Job(job_id, job_dir, options, self.manager.Event())
+        self.jobs[job_id] = job
+
+        job.future = self.executor.submit(run_job, job_id, job_dir, options, self.num_search_workers,
+                                          self.events, job.stop_event)
+        job.future.add_done_callback(lambda _: self.loop.call_soon_threadsafe(self.on_done, job))
+
+        return job
+
+    def get(self, job_id):
+        if job_id not in self.jobs:
+            raise HttpError(404, f'Job {job_id} not found')
+
+        return self.jobs[job_id]
+
+    # handlers: (status, content type, body) or None if the response is written by the handler
+
+    async def list_jobs(self, query, body, writer):
+        return (200, 'application/json', [job.to_dict() for job in self.jobs.values()])
+
+    async def create_job(self, query, body, writer):
+        if not body:
+            raise HttpError(400, 'MS Project xml is expected in the request body')
+
+        job = self.submit(parse_options(query), body)
+        return (201, 'application/json', job.to_dict())
+
+    async def get_job(self, query, body, writer, job_id):
+        return (200, 'application/json', self.get(job_id).to_dict())
+
+    async def cancel_job(self, query, body, writer, job_id):
+        job = self.get(job_id)
+        if job.status in FINAL_STATUSES:
+            raise HttpError(409, f'Job {job_id} is already {job.status}')
+
+        # a queued job never starts, a running one stops its search & finishes as cancelled
+        if not job.future.cancel():
+            await self.loop.run_in_executor(None, job.stop_event.set)
+
+        return (202, 'application/json', job.to_dict())
+
+    async def get_result(self, query, body, writer, job_id):
+        job = self.get(job_id)
+        path = os.path.join(job.dir, 'output.xml')
+        if job.status not in ('ok', 'cancelled') or not os.path.exists(path):
+            raise HttpError(409, f'Job {job_id} is {job.status}, there is no result')
+
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        filename = quote(f"{job.options['name']}.xml")
+        headers = {'Content-Disposition': f"attachment; filename*=UTF-8''{filename}"}
+        await self.respond(writer, 200, 'application/xml', content, headers)
+
+    async def get_log(self, query, body, writer, job_id):
+        path = os.path.join(self.get(job_id).dir, 'job.log')
+        if not os.path.exists(path):
+            raise HttpError(409, f'Job {job_id} is not started yet')
+
+        with open(path, 'rb') as f:
+            return (200, 'text/plain; charset=utf-8', f.read())
+
+    async def stream_events(self, query, body, writer, job_id):
+        # incumbents so far, then the live ones until the job is finished
+        job = self.get(job_id)
+        queue = asyncio.Queue()
+        history = job.incumbents + [{'type': 'status', 'status': job.status}]
+        job.subscribers.add(queue)
+
+        try:
+            writer.write(self.get_head(200, 'text/event-stream', None, {'Cache-Control': 'no-cache'}))
+            for event in history:
+                writer.write(self.to_sse(event))
+            await writer.drain()
+
+            while job.status not in FINAL_STATUSES or not queue.empty():
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_TIME)
+                except asyncio.TimeoutError:
+                    writer.write(b': keepalive\n\n')
+                else:
+                    writer.write(self.to_sse(event))
+                await writer.drain()
+        finally:
+            job.subscribers.discard(queue)
+
+    def to_sse(self, event):
+        data = {k: v for k, v in event.items() if k != 'type'}
+        return f"event: {event['type']}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+    def get_head(self, status, content_type, length, headers=None):
+        lines = [f'HTTP/1.1 {status} {HTTP_REASONS[status]}', f'Content-Type: {content_type}', 'Connection: close']
+        if length is not None:
+            lines.append(f'Content-Length: {length}')
+        lines.extend(f'{k}: {v}' for k, v in (headers or {}).items())
+
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+
+    async def respond(self, writer, status, content_type, content, headers=None):
+        if content_type == 'application/json':
+            content = json.dumps(content, ensure_ascii=False, indent=4).encode('utf-8')
+
+        writer.write(self.get_head(status, content_type, len(content), headers) + content)
+        await writer.drain()
+
+    async def read_request(self, reader):
+        # (method, path, query, body) of a request, a connection serves a single one
+        (method, target, _) = (await reader.readline()).decode('latin-1').split(' ', 2)
+
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            (key, value) = line.decode('latin-1').split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length > MAX_UPLOAD_SIZE:
+            raise HttpError(413, f'Upload is larger than {MAX_UPLOAD_SIZE} bytes')
+
+        body = await reader.readexactly(length) if length else b''
+        url = urlsplit(target)
+        return (method, url.path, url.query, body)
+
+    async def handle(self, reader, writer):
+        try:
+            (method, path, query, body) = await self.read_request(reader)
+
+            routes = [(m, re.fullmatch(pattern, path), handler) for (m, pattern, handler) in self.ROUTES]
+            routes = [(m, match, handler) for (m, match, handler) in routes if match]
+            if not routes:
+                raise HttpError(404, f'No such resource: {path}')
+
+            route = next(((match, handler) for (m, match, handler) in routes if m == method), None)
+            if route is None:
+                raise HttpError(405, f'{method} is not allowed for {path}')
+
+            (match, handler) = route
+            response = await getattr(self, handler)(query, body, writer, **match.groupdict())
+            if response is not None:
+                await self.respond(writer, *response)
+        except HttpError as e:
+            await self.respond(writer, e.status, 'application/json', {'error': str(e)})
+        except (ValueError, asyncio.IncompleteReadError):
+            await self.respond(writer, 400, 'application/json', {'error': 'Malformed request'})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        self.loop = asyncio.get_running_loop()
+        self.loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        pump = threading.Thread(target=self.pump_events, daemon=True)
+        pump.start()
+
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f'Scheduling service on http://{host}:{port}, '
+              f'{self.num_jobs} jobs at once x {self.num_search_workers} search workers')
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        # running searches are stopped, queued jobs dropped
+        self.closing = True
+        for job in self.jobs.values():
+            if job.status not in FINAL_STATUSES:
+                job.future.cancel()
+                job.stop_event.set()
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.events.put(None)
+        self.manager.shutdown()
+
+
+# python server.py --port 8080 -j 2
+# curl --data-binary "@./inputs/new/исходные данные.xml" "http://localhost:8080/jobs?mode=duration,cost&name=new"
+# curl -N http://localhost:8080/jobs/<id>/events
+# curl -OJ http://localhost:8080/jobs/<id>/result
+# curl -X DELETE http://localhost:8080/jobs/<id>
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Task scheduling service')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='interface to listen on, local only by default')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='port to listen on')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help=f'jobs run at once, the rest are queued; by default a job per {SEARCH_WORKERS} cores')
+    parser.add_argument('--jobs-dir', type=str, default=JOBS_DIR,
+                        help='uploads, results & logs of the jobs')
+
+    args = parser.parse_args()
+
+    num_jobs = args.jobs or max(1, (os.cpu_count() or 1) // SEARCH_WORKERS)
+    os.makedirs(args.jobs_dir, exist_ok=True)
+
+    service = SchedulingService(args.jobs_dir, num_jobs)
+    with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+        asyncio.run(service.serve(args.host, args.port))